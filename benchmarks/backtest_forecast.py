@@ -0,0 +1,152 @@
+"""Backtest the job listing forecasts and time the batched fit.
+
+    python backtest_forecast.py
+    python backtest_forecast.py --origins 24 --horizon 3
+    python backtest_forecast.py --synthetic 1000 --months 72
+
+The forecasts are refitted at each of the last --origins months, using only the
+months before it, and compared with what was published in the --horizon months
+after. By default the series are the ones the app forecasts (all ads, the
+industry and each employment type, from the postings store or
+CCC_datechange.csv); --synthetic backtests that many seeded series from
+generators.monthly_job_listings instead.
+
+Reported per series: the mean absolute percentage error of the forecast and of
+the seasonal naive forecast (the same month a year earlier), the share of
+actuals inside the prediction interval, and the fit time per series, both
+fitted together in one batch and fitted one series at a time. Results go to
+--results as JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+import generators
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(generators.REPO_DIR, 'streamlit'))
+
+from job_forecast import SEASON_LENGTH, fit_holt_winters, job_listing_counts, predict_holt_winters
+from job_postings import load_job_postings, load_job_postings_store, store_exists
+
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, 'forecast_results.json')
+
+
+def app_series():
+    """Names and (series, months) counts of the series the app forecasts, over the months all of them cover."""
+    data = load_job_postings_store() if store_exists() else load_job_postings()
+    counts = job_listing_counts(data).dropna()
+    return list(counts.columns), counts.to_numpy(dtype=np.float64).T
+
+
+def synthetic_series(n_series, n_months, seed):
+    return [f'series {i}' for i in range(n_series)], generators.monthly_job_listings(n_series, n_months, seed)
+
+
+def backtest(values, origins, horizon, level):
+    """Forecast from each origin and collect errors, interval hits and fit times per series."""
+    n_series, n_months = values.shape
+    first_origin = n_months - origins
+    if first_origin < 2 * SEASON_LENGTH:
+        raise ValueError(f"{n_months} months leave fewer than two seasons before the first of {origins} origins")
+
+    errors = [[] for _ in range(n_series)]
+    naive_errors = [[] for _ in range(n_series)]
+    hits = [[] for _ in range(n_series)]
+    batch_seconds = 0.0
+    single_seconds = 0.0
+    for origin in range(first_origin, n_months):
+        history = np.log1p(values[:, :origin])
+        started = time.perf_counter()
+        fit = fit_holt_winters(history)
+        batch_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(n_series):
+            fit_holt_winters(history[i:i + 1])
+        single_seconds += time.perf_counter() - started
+
+        mean, lower, upper = (np.maximum(np.expm1(v), 0) for v in predict_holt_winters(fit, horizon, level))
+        steps = min(horizon, n_months - origin)
+        actual = values[:, origin:origin + steps]
+        naive = values[:, origin - SEASON_LENGTH:origin - SEASON_LENGTH + steps]
+        # Months without listings have no percentage error
+        valid = actual > 0
+        for i in range(n_series):
+            errors[i].extend(np.abs(mean[i, :steps] - actual[i])[valid[i]] / actual[i][valid[i]])
+            naive_errors[i].extend(np.abs(naive[i] - actual[i])[valid[i]] / actual[i][valid[i]])
+            hits[i].extend((lower[i, :steps] <= actual[i]) & (actual[i] <= upper[i, :steps]))
+
+    return {
+        'mape': [float(np.mean(e)) * 100 if e else None for e in errors],
+        'naive_mape': [float(np.mean(e)) * 100 if e else None for e in naive_errors],
+        'coverage': [float(np.mean(h)) * 100 for h in hits],
+        'batch_ms_per_series': batch_seconds / origins / n_series * 1000,
+        'single_ms_per_series': single_seconds / origins / n_series * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--origins', type=int, default=12, help="forecast origins, the last months of the data")
+    parser.add_argument('--horizon', type=int, default=6, help="months forecast from each origin")
+    parser.add_argument('--level', type=float, default=0.95, help="prediction interval level")
+    parser.add_argument('--synthetic', type=int, metavar='SERIES', help="backtest this many generated series")
+    parser.add_argument('--months', type=int, default=72, help="months per generated series")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--results', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        names, values = synthetic_series(args.synthetic, args.months, args.seed)
+    else:
+        names, values = app_series()
+    result = backtest(values, args.origins, args.horizon, args.level)
+
+    print(f"{len(names)} series, {values.shape[1]} months, {args.origins} origins, {args.horizon} months ahead")
+    print(f"{'series':28s} {'MAPE':>7s} {'naive':>7s} {'coverage':>9s}")
+    for i, name in enumerate(names[:50]):
+        mape, naive = result['mape'][i], result['naive_mape'][i]
+        print(f"{name:28s} {mape if mape is not None else float('nan'):6.1f}% "
+              f"{naive if naive is not None else float('nan'):6.1f}% {result['coverage'][i]:8.1f}%")
+    if len(names) > 50:
+        print(f"... {len(names) - 50} more in {args.results}")
+    print(f"Median MAPE {np.nanmedian(np.array(result['mape'], dtype=float)):.1f}% "
+          f"(seasonal naive {np.nanmedian(np.array(result['naive_mape'], dtype=float)):.1f}%), "
+          f"mean coverage {np.mean(result['coverage']):.1f}% for a {args.level:.0%} interval")
+    print(f"Fit time per series: {result['batch_ms_per_series']:.3f} ms batched, "
+          f"{result['single_ms_per_series']:.3f} ms one at a time")
+
+    report = {
+        'series': len(names),
+        'months': int(values.shape[1]),
+        'origins': args.origins,
+        'horizon': args.horizon,
+        'level': args.level,
+        'synthetic': args.synthetic,
+        'seed': args.seed if args.synthetic else None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'batch_ms_per_series': round(result['batch_ms_per_series'], 4),
+        'single_ms_per_series': round(result['single_ms_per_series'], 4),
+        'per_series': {
+            name: {
+                'mape': None if result['mape'][i] is None else round(result['mape'][i], 2),
+                'naive_mape': None if result['naive_mape'][i] is None else round(result['naive_mape'][i], 2),
+                'coverage': round(result['coverage'][i], 2),
+            }
+            for i, name in enumerate(names)
+        },
+    }
+    with open(args.results, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.results}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Excel's row limit; larger Artikellistan workbooks cannot exist
+EXCEL_MAX_ROWS = 1048576
+
+# Same layout as the Systembolaget workbooks: four preamble rows, then the header
+ARTIKELLISTAN_COLUMNS = [
+    'Artnr', 'Varunr', 'Kvittonamn', 'Namn', 'Producentnamn', 'Varugrupp', 'Varugrupp detalj', 'Rubrik',
+    'Aktuellt pris', 'Volym i ml', 'Buteljtyp', 'Land', 'Region', 'Ursprung', 'Ekologisk', 'Etiskt',
+    'Försäljning i liter', 'Artikel ID',
+]
+ARTIKELLISTAN_PREAMBLE_ROWS = 4
+
+# (Varugrupp, Varugrupp detalj, share of the articles), roughly as in Artikellistan 2018
+PRODUCT_GROUPS = [
+    ('Vin', 'Rött vin', 0.22), ('Vin', 'Vitt vin', 0.12), ('Öl', 'Specialöl', 0.08), ('Sprit', 'Whisky', 0.06),
+    ('Vin', 'Mousserande vin', 0.06), ('Vin', 'Övrigt vin', 0.04), ('Sprit', 'Avec', 0.03), ('Öl', 'Lageröl', 0.03),
+    ('Sprit', 'Drinkar & Cocktails', 0.02), ('Vin', 'Rosévin', 0.02), ('Sprit', 'Likör', 0.02),
+    ('Cider', 'Cider & blanddrycker', 0.01), ('Öl', 'Säsongsöl', 0.01), ('Sprit', 'Snaps', 0.01),
+    ('Presentartiklar', 'Presentsortiment', 0.01), ('Alkoholfritt', 'Alkoholfritt', 0.26),
+]
+BOTTLE_TYPES = ['Helbutelj', 'Halvbutelj', 'Burk', 'Flaska', 'Bag in box', 'Tetra']
+COUNTRIES = ['Sverige', 'Frankrike', 'Italien', 'Spanien', 'Tyskland', 'USA', 'Chile', 'Australien', 'Belgien',
+             'Storbritannien', 'Internationellt märke']
+WORDS = ['Lager', 'IPA', 'Pale', 'Ale', 'Stout', 'Porter', 'Reserva', 'Brut', 'Classic', 'Gold', 'Red', 'Dry',
+         'Original', 'Premium', 'Organic', 'Barrel', 'Hazy', 'Sour', 'Pilsner', 'Export']
+
+
+def _registry_producers():
+    # Every alias in the brewery group registry, so the market share groups have sales
+    with open(os.path.join(REPO_DIR, 'streamlit', 'brewery_groups.json'), encoding='utf-8') as f:
+        registry = json.load(f)
+    return [alias for breweries in registry.values() for aliases in breweries.values() for alias in aliases]
+
+
+def artikellistan_frame(n_rows, seed=0):
+    """Artikellistan-shaped rows with realistic cardinalities (about one producer per five articles)."""
+    rng = np.random.default_rng(seed)
+    producers = np.array(_registry_producers() + [f'Producent {i} AB' for i in range(max(50, n_rows // 5))])
+    # A few large producers sell most of the articles
+    producer_weights = 1.0 / np.arange(1, len(producers) + 1) ** 0.8
+    group_shares = np.array([share for _, _, share in PRODUCT_GROUPS])
+    group_ids = rng.choice(len(PRODUCT_GROUPS), n_rows, p=group_shares / group_shares.sum())
+    names = np.array([f'{a} {b}' for a in WORDS for b in WORDS])
+    name_ids = rng.integers(0, len(names), n_rows)
+    volumes = rng.choice([330, 375, 500, 700, 750, 1000, 3000], n_rows)
+    countries = np.array(COUNTRIES)[rng.integers(0, len(COUNTRIES), n_rows)]
+    article_ids = np.arange(1, n_rows + 1)
+
+    return pd.DataFrame({
+        'Artnr': article_ids * 100 + 1,
+        'Varunr': article_ids,
+        'Kvittonamn': [f'{name} {i} {volume} ml' for name, i, volume in zip(names[name_ids], article_ids, volumes)],
+        'Namn': names[name_ids],
+        'Producentnamn': producers[rng.choice(len(producers), n_rows, p=producer_weights / producer_weights.sum())],
+        'Varugrupp': [PRODUCT_GROUPS[i][0] for i in group_ids],
+        'Varugrupp detalj': [PRODUCT_GROUPS[i][1] for i in group_ids],
+        'Rubrik': rng.choice([w.upper() for w in WORDS], n_rows),
+        'Aktuellt pris': np.round(rng.lognormal(5, 0.8, n_rows)),
+        'Volym i ml': volumes,
+        'Buteljtyp': rng.choice(BOTTLE_TYPES, n_rows),
+        'Land': countries,
+        'Region': countries,
+        'Ursprung': countries,
+        'Ekologisk': None,
+        'Etiskt': None,
+        # Heavy-tailed like the real sales: most articles sell little, a few sell a lot
+        'Försäljning i liter': np.round(rng.lognormal(3, 2.5, n_rows), 1),
+        'Artikel ID': article_ids,
+    })[ARTIKELLISTAN_COLUMNS]
+
+
+def write_artikellista(path, n_rows, seed=0):
+    """Write an Artikellistan workbook with `n_rows` articles (at most Excel's row limit)."""
+    from openpyxl import Workbook
+
+    n_rows = min(n_rows, EXCEL_MAX_ROWS - ARTIKELLISTAN_PREAMBLE_ROWS - 1)
+    frame = artikellistan_frame(n_rows, seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([])
+    sheet.append(['ARTIKELLISTAN'])
+    sheet.append([])
+    sheet.append([])
+    sheet.append(ARTIKELLISTAN_COLUMNS)
+    for row in frame.itertuples(index=False):
+        sheet.append([None if value is None or value != value else value for value in row])
+    workbook.save(path)
+    return n_rows
+
+
+# Keyword-bearing headlines make up `hospitality_share` of the ads, as KEYWORDS in job_clustering.py select them
+HOSPITALITY_HEADLINES = ['Kock till restaurang', 'Servitör/Servitris sökes', 'Bartender', 'Diskare extra',
+                         'Hotellreceptionist', 'KÖKSCHEF & kock']
+OTHER_HEADLINES = ['Lagerarbetare', 'Sjuksköterska', 'Systemutvecklare Python', 'Chaufför C-körkort',
+                   'Butikssäljare', 'Lärare i matematik', 'Elektriker', 'Ekonomiassistent']
+DESCRIPTION_WORDS = ('vi söker dig som vill arbeta i ett trevligt team med goda villkor och kollektivavtal '
+                     'erfarenhet meriterande körkort tjänsten innebär ansvar för kunder och kollegor').split()
+EMPLOYMENT_TYPES = ['Vanlig anställning', 'Sommarjobb / feriejobb', 'Behovsanställning', 'Säsongsanställning']
+WORKING_HOURS = ['Heltid', 'Deltid']
+DURATIONS = ['Tills vidare', '3 månader – upp till 6 månader', '11 dagar - upp till 3 månader', 'Upp till 10 dagar']
+CONDITIONS = ['Heltid', 'Deltid', 'Enligt överenskommelse', 'Timlön', None]
+REGIONS = ['Stockholms län', 'Västra Götalands län', 'Skåne län', 'Uppsala län', 'Östergötlands län',
+           'Jönköpings län', 'Hallands län', 'Norrbottens län']
+OCCUPATION_FIELDS = ['Hotell, restaurang, storhushåll', 'Transport, distribution, lager', 'Hälso- och sjukvård',
+                     'Data/IT', 'Försäljning, inköp, marknadsföring', 'Pedagogik']
+
+
+def _concept(label, i):
+    return {'concept_id': f'c{i}', 'label': label, 'legacy_ams_taxonomy_id': str(i)}
+
+
+def job_ad(rng, i, hospitality_share=0.05, description_words=150):
+    """One job ad in the JobTech historical-ads layout.
+
+    Flattened with pd.json_normalize(sep='_'), the ads have exactly the 88
+    columns listed in "All searchable column names".
+    """
+    hospitality = rng.random() < hospitality_share
+    headlines = HOSPITALITY_HEADLINES if hospitality else OTHER_HEADLINES
+    headline = headlines[rng.integers(len(headlines))]
+    day = int(rng.integers(19358, 19723))  # 2023-01-01 .. 2023-12-31
+    published = str(np.datetime64(day, 'D'))
+    removed = bool(rng.random() < 0.3)
+    region = int(rng.integers(len(REGIONS)))
+    field = 0 if hospitality else int(rng.integers(1, len(OCCUPATION_FIELDS)))
+    text = ' '.join(DESCRIPTION_WORDS[j] for j in rng.integers(0, len(DESCRIPTION_WORDS), description_words))
+    employment_type = int(rng.integers(len(EMPLOYMENT_TYPES)))
+    return {
+        'id': str(i),
+        'external_id': f'ext-{i}',
+        'original_id': None,
+        'webpage_url': f'https://arbetsformedlingen.se/platsbanken/annonser/{i}',
+        'logo_url': None,
+        'headline': f'{headline} {i}',
+        'application_deadline': f'{published}T23:59:59',
+        'number_of_vacancies': int(rng.integers(1, 5)),
+        'description': {
+            'text': text,
+            'text_formatted': text,
+            'company_information': None,
+            'needs': None,
+            'requirements': None,
+            'conditions': CONDITIONS[rng.integers(len(CONDITIONS))],
+        },
+        'employment_type': [_concept(EMPLOYMENT_TYPES[employment_type], employment_type)],
+        'salary_type': _concept('Fast månads- vecko- eller timlön', 1),
+        'salary_description': None,
+        'duration': _concept(DURATIONS[rng.integers(len(DURATIONS))], 2),
+        'working_hours_type': _concept(WORKING_HOURS[rng.integers(len(WORKING_HOURS))], 3),
+        'scope_of_work': {'min': 100, 'max': 100},
+        'access': None,
+        'employer': {
+            'phone_number': None,
+            'email': None,
+            'url': None,
+            'organization_number': f'55{i % 10000000:08d}',
+            'name': f'Arbetsgivare {i % 5000} AB',
+            'workplace': f'Arbetsplats {i % 5000}',
+        },
+        'application_details': {'information': None, 'reference': None, 'email': None, 'via_af': False,
+                                 'url': None, 'other': None},
+        'experience_required': bool(rng.random() < 0.5),
+        'access_to_own_car': bool(rng.random() < 0.1),
+        'driving_license_required': bool(rng.random() < 0.2),
+        'driving_license': None,
+        'occupation': [_concept(headline, 10)],
+        'occupation_group': [_concept(headline, 11)],
+        'occupation_field': [_concept(OCCUPATION_FIELDS[field], 12)],
+        'workplace_address': {
+            'municipality': f'Kommun {region}',
+            'municipality_code': f'{region:04d}',
+            'municipality_concept_id': f'm{region}',
+            'region': REGIONS[region],
+            'region_code': f'{region:02d}',
+            'region_concept_id': f'r{region}',
+            'country': 'Sverige',
+            'country_code': '199',
+            'country_concept_id': 'i46j_HmG_v64',
+            'street_address': None,
+            'postcode': None,
+            'city': None,
+            'coordinates': [None, None],
+        },
+        'must_have': {'skills': [], 'languages': [], 'work_experiences': [], 'education': [], 'education_level': []},
+        'nice_to_have': {'skills': [], 'languages': [], 'work_experiences': [], 'education': [],
+                         'education_level': []},
+        'application_contacts': [],
+        'publication_date': f'{published}T08:00:00',
+        'last_publication_date': f'{published}T23:59:59',
+        'removed': removed,
+        'removed_date': f'{published}T12:00:00' if removed else None,
+        'source_type': 'VIA_AF_FORMULAR',
+        'timestamp': day * 86400000,
+        'remote_work': bool(rng.random() < 0.05),
+        'open_for_all': False,
+        'trainee': False,
+        'larling': False,
+        'franchise': False,
+        'hire_work_place': False,
+        'keywords': {'extracted': {'occupation': [headline.lower()], 'skill': [], 'location': [], 'employer': []}},
+        'detected_language': 'sv',
+    }
+
+
+def write_job_ads(path, n_ads, seed=0, hospitality_share=0.05, description_words=150):
+    """Write `n_ads` synthetic job ads as JSONL, one ad per line, like the JobTech yearly files."""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n_ads):
+            f.write(json.dumps(job_ad(rng, i, hospitality_share, description_words), ensure_ascii=False) + '\n')
+    return n_ads
+
+
+def write_job_postings_csv(path, n_rows, seed=0):
+    """Write a CCC_datechange.csv-shaped file (cluster, publication_date) covering 2018-2023."""
+    rng = np.random.default_rng(seed)
+    clusters = np.array(['Full-time', 'Part-time', 'On-call', 'Summer'])
+    days = rng.integers(17532, 19722, n_rows)  # 2018-01-01 .. 2023-12-30
+    pd.DataFrame({
+        'cluster': clusters[rng.choice(4, n_rows, p=[0.6, 0.27, 0.07, 0.06])],
+        'publication_date': days.astype('datetime64[D]'),
+    }).to_csv(path, index=False)
+    return n_rows
+
+
+def monthly_job_listings(n_series, n_months, seed=0):
+    """(n_series, n_months) monthly counts with a yearly season, a drifting trend and noise.
+
+    Each series has its own size (hundreds to tens of thousands), season shape
+    and growth, like the industry and employment type series of the app.
+    """
+    rng = np.random.default_rng(seed)
+    months = np.arange(n_months)
+    scale = np.exp(rng.uniform(np.log(100), np.log(50000), (n_series, 1)))
+    season = rng.normal(0, 0.2, (n_series, 12))
+    growth = rng.normal(0, 0.01, (n_series, 1)) * months + np.cumsum(rng.normal(0, 0.03, (n_series, n_months)), axis=1)
+    noise = rng.normal(0, 0.08, (n_series, n_months))
+    return np.round(scale * np.exp(season[:, months % 12] + growth + noise))
+
+
+def check_job_ad_schema(n_ads=100):
+    """Raise if the generated ads do not flatten to the columns in "All searchable column names"."""
+    sys.path.insert(0, os.path.join(REPO_DIR, 'dataset manipulation'))
+    from jsonl_flatten import read_field_list
+
+    expected = read_field_list(os.path.join(REPO_DIR, 'All searchable column names'))
+    rng = np.random.default_rng(0)
+    columns = set(pd.json_normalize([job_ad(rng, i) for i in range(n_ads)], sep='_').columns)
+    if columns != set(expected):
+        raise ValueError(f"Generated ads do not match the schema: missing {sorted(set(expected) - columns)}, "
+                         f"extra {sorted(columns - set(expected))}")
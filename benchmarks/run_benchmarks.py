@@ -0,0 +1,354 @@
+"""Time every data path of the project on seeded synthetic data.
+
+    python run_benchmarks.py --rows 100000
+    python run_benchmarks.py --rows 100000 --save-baseline
+    python run_benchmarks.py --rows 1000000 --stages read_jsonl clustering
+
+Inputs are generated once per (rows, seed) under --data-dir and reused. Each
+stage runs in a fresh Python process, so its peak RSS is its own (worker
+processes are reported separately); setup (e.g. converting the workbooks
+before the warm load) is not timed. Results go to --results as JSON and are
+compared with the baseline recorded for the same number of rows; the exit
+status is 1 when a stage is slower or uses more memory than the baseline
+allows.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import generators
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(generators.REPO_DIR, 'streamlit'))
+sys.path.insert(0, os.path.join(generators.REPO_DIR, 'dataset manipulation'))
+
+from instrumentation import peak_rss_mb
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DATA_DIR = os.path.join(BENCHMARK_DIR, 'data')
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, 'results.json')
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# Years of Artikellistan workbooks the dashboard loads; the rows are split between them
+SALES_YEARS = [2018, 2019, 2020, 2021, 2022, 2023]
+
+# A stage regresses when it is this much slower than the baseline and by at
+# least TIME_SLACK_SECONDS, or when its peak memory grows by this fraction and
+# by at least MEMORY_SLACK_MB; the slack keeps millisecond stages from flapping
+TOLERANCE = 0.25
+TIME_SLACK_SECONDS = 0.05
+MEMORY_SLACK_MB = 20
+
+
+def artikellistan_dir(data_dir, rows, seed):
+    return os.path.join(data_dir, f'artikellistan-{rows}-{seed}')
+
+
+def job_ads_path(data_dir, rows, seed):
+    return os.path.join(data_dir, f'job_ads-{rows}-{seed}.jsonl')
+
+
+def job_postings_path(data_dir, rows, seed):
+    return os.path.join(data_dir, f'job_postings-{rows}-{seed}.csv')
+
+
+def generate_inputs(data_dir, rows, seed, stages):
+    """Write the synthetic inputs the selected stages need, unless they exist already."""
+    os.makedirs(data_dir, exist_ok=True)
+    kinds = {STAGES[name][0] for name in stages}
+
+    if 'artikellistan' in kinds:
+        directory = artikellistan_dir(data_dir, rows, seed)
+        os.makedirs(directory, exist_ok=True)
+        for i, year in enumerate(SALES_YEARS):
+            path = os.path.join(directory, f'Artikellistan {year}.xlsx')
+            if not os.path.exists(path):
+                started = time.perf_counter()
+                written = generators.write_artikellista(path + '.tmp.xlsx', rows // len(SALES_YEARS), seed + i)
+                os.replace(path + '.tmp.xlsx', path)
+                print(f"Generated {path} ({written} rows) in {time.perf_counter() - started:.1f}s")
+
+    if 'job_ads' in kinds and not os.path.exists(job_ads_path(data_dir, rows, seed)):
+        path = job_ads_path(data_dir, rows, seed)
+        started = time.perf_counter()
+        generators.check_job_ad_schema()
+        generators.write_job_ads(path + '.tmp', rows, seed)
+        os.replace(path + '.tmp', path)
+        print(f"Generated {path} in {time.perf_counter() - started:.1f}s")
+
+    if 'job_postings' in kinds and not os.path.exists(job_postings_path(data_dir, rows, seed)):
+        path = job_postings_path(data_dir, rows, seed)
+        generators.write_job_postings_csv(path + '.tmp', rows, seed)
+        os.replace(path + '.tmp', path)
+        print(f"Generated {path}")
+
+
+class Measurement:
+    def __init__(self):
+        self.rows = 0
+        self.seconds = None
+        self.peak_before = None
+        self.peak_after = None
+
+
+@contextmanager
+def measured():
+    """Time the block and record how far it raised the process's peak RSS."""
+    measurement = Measurement()
+    measurement.peak_before = peak_rss_mb()
+    started = time.perf_counter()
+    yield measurement
+    measurement.seconds = time.perf_counter() - started
+    measurement.peak_after = peak_rss_mb()
+
+
+def _use_artikellistan(directory, cache_dir):
+    # Point the loader at the generated workbooks and an empty Parquet cache
+    import artikellistan
+
+    artikellistan.DATA_DIR = directory
+    artikellistan.CACHE_DIR = cache_dir
+    return artikellistan
+
+
+def stage_artikellistan_convert(inputs):
+    # Cold load_data: every workbook parsed and converted to Parquet
+    artikellistan = _use_artikellistan(inputs['artikellistan'], inputs['tmp'])
+    with measured() as m:
+        artikellistan.convert_missing(SALES_YEARS)
+        for year in SALES_YEARS:
+            artikellistan.load_artikellista(year)
+    m.rows = sum(len(artikellistan.load_artikellista(year)) for year in SALES_YEARS)
+    return m
+
+
+def stage_artikellistan_load(inputs):
+    # Warm load_data: the dashboard columns of every year from the Parquet cache
+    artikellistan = _use_artikellistan(inputs['artikellistan'], inputs['tmp'])
+    artikellistan.convert_missing(SALES_YEARS)
+    with measured() as m:
+        data = artikellistan.load_years(SALES_YEARS)
+    m.rows = len(data)
+    return m
+
+
+def stage_sales_cube(inputs):
+    artikellistan = _use_artikellistan(inputs['artikellistan'], inputs['tmp'])
+    artikellistan.convert_missing(SALES_YEARS)
+    with measured() as m:
+        artikellistan.build_sales_cube(SALES_YEARS)
+    m.rows = sum(len(artikellistan.load_artikellista(year)) for year in SALES_YEARS)
+    return m
+
+
+def stage_market_share_changes(inputs):
+    # get_combined_percentage_change_data, from the cached sales cube
+    artikellistan = _use_artikellistan(inputs['artikellistan'], inputs['tmp'])
+    artikellistan.convert_missing(SALES_YEARS)
+    cube = artikellistan.build_sales_cube(SALES_YEARS)
+    with measured() as m:
+        artikellistan.market_share_changes(cube, SALES_YEARS)
+    m.rows = len(cube)
+    return m
+
+
+def stage_job_postings_load(inputs):
+    from job_postings import read_job_postings_csv
+
+    with measured() as m:
+        data = read_job_postings_csv(inputs['job_postings'])
+    m.rows = len(data)
+    return m
+
+
+def stage_employment_type_counts(inputs):
+    # The employment type tab's daily, monthly and quarterly tables
+    from job_postings import employment_type_counts, read_job_postings_csv
+
+    data = read_job_postings_csv(inputs['job_postings'])
+    with measured() as m:
+        employment_type_counts(data)
+    m.rows = len(data)
+    return m
+
+
+def stage_job_forecasts(inputs):
+    # The forecast tab's monthly counts and forecasts, total and per employment type
+    from job_forecast import forecast_monthly, monthly_counts
+    from job_postings import read_job_postings_csv
+
+    data = read_job_postings_csv(inputs['job_postings'])
+    with measured() as m:
+        forecast_monthly(monthly_counts(data))
+    m.rows = len(data)
+    return m
+
+
+def stage_flatten_jsonl(inputs):
+    from jsonl_flatten import flatten_jsonl
+
+    with measured() as m:
+        stats = flatten_jsonl(inputs['job_ads'], os.path.join(inputs['tmp'], 'flat.parquet'))
+    m.rows = stats['rows']
+    return m
+
+
+def stage_read_jsonl(inputs):
+    # Keyword filter and field extraction of cluster_json.py, over all cores
+    from job_clustering import FEATURE_FIELDS, KEYWORDS
+    from jsonl_ingest import read_jsonl
+
+    with measured() as m:
+        read_jsonl(inputs['job_ads'], columns=['id', 'headline', 'publication_date'], keywords=KEYWORDS,
+                   fields=FEATURE_FIELDS)
+    m.rows = inputs['rows']
+    return m
+
+
+def stage_clustering(inputs):
+    # Fitting and labelling the hospitality ads, as in cluster_json.py
+    from job_clustering import FEATURE_FIELDS, KEYWORDS, JobAdClusterer
+    from jsonl_ingest import read_jsonl
+
+    ads = read_jsonl(inputs['job_ads'], columns=['id'], keywords=KEYWORDS, fields=FEATURE_FIELDS)
+    with measured() as m:
+        JobAdClusterer(list(FEATURE_FIELDS), n_clusters=4).fit_predict(ads)
+    m.rows = len(ads)
+    return m
+
+
+# Stage name -> (input it needs, function)
+STAGES = {
+    'artikellistan_convert': ('artikellistan', stage_artikellistan_convert),
+    'artikellistan_load': ('artikellistan', stage_artikellistan_load),
+    'sales_cube': ('artikellistan', stage_sales_cube),
+    'market_share_changes': ('artikellistan', stage_market_share_changes),
+    'job_postings_load': ('job_postings', stage_job_postings_load),
+    'employment_type_counts': ('job_postings', stage_employment_type_counts),
+    'job_forecasts': ('job_postings', stage_job_forecasts),
+    'flatten_jsonl': ('job_ads', stage_flatten_jsonl),
+    'read_jsonl': ('job_ads', stage_read_jsonl),
+    'clustering': ('job_ads', stage_clustering),
+}
+
+
+def workers_peak_rss_mb():
+    """Largest peak RSS of any finished worker process of this process, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(stage, data_dir, rows, seed):
+    """Run one stage in this process and print its result as a JSON line."""
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = {
+            'rows': rows,
+            'tmp': tmp,
+            'artikellistan': artikellistan_dir(data_dir, rows, seed),
+            'job_ads': job_ads_path(data_dir, rows, seed),
+            'job_postings': job_postings_path(data_dir, rows, seed),
+        }
+        m = STAGES[stage][1](inputs)
+    result = {
+        'seconds': round(m.seconds, 4),
+        'rows': m.rows,
+        'rows_per_second': round(m.rows / m.seconds) if m.seconds else None,
+        'peak_rss_mb': None if m.peak_after is None else round(m.peak_after, 1),
+        'peak_rss_delta_mb': None if m.peak_after is None else round(m.peak_after - m.peak_before, 1),
+        # Stages that fan out to a process pool (workbook conversion, read_jsonl)
+        'workers_peak_rss_mb': None if resource is None else round(workers_peak_rss_mb(), 1),
+    }
+    print(json.dumps(result))
+
+
+def run_stage(stage, data_dir, rows, seed):
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', stage, '--data-dir', data_dir,
+         '--rows', str(rows), '--seed', str(seed)],
+        stdout=subprocess.PIPE, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Print each stage next to its baseline and return the names of the stages that regressed."""
+    regressions = []
+    for stage, result in results.items():
+        reference = baseline.get(stage)
+        if reference is None:
+            print(f"{stage:24s} {result['seconds']:9.3f}s  (no baseline)")
+            continue
+        time_ratio = result['seconds'] / reference['seconds'] if reference['seconds'] else 1.0
+        memory_growth = (result['peak_rss_delta_mb'] or 0) - (reference['peak_rss_delta_mb'] or 0)
+        slower = time_ratio > 1 + tolerance and result['seconds'] - reference['seconds'] > TIME_SLACK_SECONDS
+        bigger = memory_growth > max(MEMORY_SLACK_MB, tolerance * (reference['peak_rss_delta_mb'] or 0))
+        if slower or bigger:
+            regressions.append(stage)
+        print(f"{stage:24s} {result['seconds']:9.3f}s  baseline {reference['seconds']:9.3f}s  x{time_ratio:5.2f}  "
+              f"memory {memory_growth:+7.1f} MB" + ("  REGRESSION" if slower or bigger else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help="rows (ads, articles, postings) per input")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--results', default=RESULTS_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--child', choices=list(STAGES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.data_dir, args.rows, args.seed)
+        return
+
+    generate_inputs(args.data_dir, args.rows, args.seed, args.stages)
+    results = {stage: run_stage(stage, args.data_dir, args.rows, args.seed) for stage in args.stages}
+    report = {
+        'rows': args.rows,
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'stages': results,
+    }
+    with open(args.results, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results for {args.rows} rows written to {args.results}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baselines = json.load(f)
+    regressions = compare(results, baselines.get(str(args.rows), {}).get('stages', {}), args.tolerance)
+
+    if args.save_baseline:
+        # Baselines are kept per input size; saving one size leaves the others alone
+        previous = baselines.get(str(args.rows), {}).get('stages', {})
+        baselines[str(args.rows)] = {**report, 'stages': {**previous, **results}}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Saved as the baseline for {args.rows} rows in {args.baseline}")
+    elif regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pandas as pd
+
+from job_clustering import FEATURE_FIELDS, KEYWORDS, assign_clusters
+from jsonl_ingest import read_jsonl
+
+# The dashboard's job postings store lives with the app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit'))
+from job_postings import (append_postings, append_removals, create_store_from_csv, logged_removals, month_codes,
+                          month_label, read_state, store_exists, stored_id_months, stored_ids, to_day_numbers,
+                          write_state)
+
+# New job ads, e.g. one day's download from the JobTech stream
+new_ads_file = 'new_ads.jsonl'
+
+# Model saved by cluster_json.py
+model_path = 'job_clusterer.joblib'
+
+# The first run seeds the month-partitioned store from CCC_datechange.csv
+if not store_exists():
+    create_store_from_csv()
+    print("Created the job postings store from CCC_datechange.csv")
+state = read_state()
+mark = state['high_water_mark']['value']
+
+# Filter and extract features exactly as in cluster_json.py
+new_ads = read_jsonl(new_ads_file, columns=['id', 'publication_date'], keywords=KEYWORDS, fields=FEATURE_FIELDS)
+
+# Only ads published after the high-water mark are new. Ads published at the
+# mark itself are kept and dropped below if their ID is already stored.
+published = new_ads['publication_date'].str[:19]
+new_ads = new_ads[published.notna() & (published >= mark)]
+
+# Label the new ads with the saved model instead of refitting on the whole year
+postings = pd.DataFrame({
+    'id': new_ads['id'].astype(str).to_numpy(),
+    'cluster': assign_clusters(new_ads, model_path) if len(new_ads) else [],
+    'day': to_day_numbers(pd.to_datetime(new_ads['publication_date'].str[:10])),
+})
+if len(postings):
+    months = month_codes(postings['day'])
+    known = stored_ids(start=month_label(months.min()), end=month_label(months.max()))
+    postings = postings[~postings['id'].isin(known)]
+written = append_postings(postings)
+
+# Removal updates in the stream carry no headline, so they are read without
+# the keyword filter and logged only for ads that are in the store
+updates = read_jsonl(new_ads_file, columns=['id', 'removed', 'removed_date'])
+updates = updates[updates['removed'].fillna(False).astype(bool) & updates['removed_date'].notna()]
+removals = pd.DataFrame({
+    'id': updates['id'].astype(str).to_numpy(),
+    'removed_day': to_day_numbers(pd.to_datetime(updates['removed_date'].str[:10])),
+}).groupby('id', as_index=False)['removed_day'].max()
+id_months = stored_id_months(removals['id'])
+removals = removals[removals['id'].isin(id_months.index)]
+removals = removals.assign(month=removals['id'].map(id_months))
+
+# The same file is read again on every run: skip removals already logged on
+# the same or a later day, so reruns write nothing and keep the store's version.
+# Only the removal logs of the months these ads were published in are read.
+if len(removals):
+    logged = removals['id'].map(logged_removals(start=month_label(removals['month'].min()),
+                                                end=month_label(removals['month'].max())))
+    removals = removals[logged.isna() | (removals['removed_day'] > logged)]
+if len(removals):
+    append_removals(removals)
+
+# Advance the high-water mark to the newest ad processed
+if len(new_ads):
+    state['high_water_mark']['value'] = max(mark, new_ads['publication_date'].str[:19].max())
+    write_state(state)
+
+print(f"Appended {len(postings)} ads to {', '.join(written) or 'no months'}, logged {len(removals)} removals")
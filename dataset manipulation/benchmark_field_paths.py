@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from job_clustering import FEATURE_FIELDS
+from jsonl_ingest import FieldProjection, read_jsonl
+
+# Seeded synthetic ads in the JobTech layout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import generators
+
+# Number of synthetic ads
+n_ads = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+# The feature fields, plus fields that are a list of concepts in some years and a
+# single concept in others. tests/test_jsonl_ingest.py checks that the paths give
+# the values the row-wise helpers the scripts used to apply gave.
+fields = dict(FEATURE_FIELDS)
+fields.update({
+    'occupation_label': 'occupation[0].label',
+    'occupation_field_label': ('occupation_field[0].label', 'occupation_field.label'),
+    'salary_type_label': ('salary_type[0].label', 'salary_type.label'),
+})
+
+with tempfile.TemporaryDirectory() as directory:
+    # Short descriptions: the extraction does not read them, and the decoded
+    # records are all held in memory
+    path = os.path.join(directory, 'synthetic_ads.jsonl')
+    generators.write_job_ads(path, n_ads, seed=42, description_words=10)
+
+    # Extraction alone, from records that are already decoded
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+
+    start = time.perf_counter()
+    projection = FieldProjection(fields)
+    projected = pd.DataFrame.from_records([projection(record) for record in records], columns=list(fields))
+    projection_seconds = time.perf_counter() - start
+    print(f"Extraction of {len(fields)} fields from {n_ads} ads: field paths {projection_seconds:.2f}s")
+
+    # End to end: decode everything, as the scripts used to before extracting; against
+    # extraction while decoding in read_jsonl
+    start = time.perf_counter()
+    with open(path, encoding='utf-8') as f:
+        data = pd.DataFrame.from_records([json.loads(line) for line in f])
+    decode_seconds = time.perf_counter() - start
+
+    for processes in (1, None):
+        start = time.perf_counter()
+        result = read_jsonl(path, columns=['id'], fields=fields, processes=processes)
+        seconds = time.perf_counter() - start
+        pd.testing.assert_frame_equal(projected, result[list(fields)])
+        print(f"Read and extract: decode everything {decode_seconds:.2f}s, "
+              f"read_jsonl with field paths ({'1 process' if processes else 'all cores'}) {seconds:.2f}s")
+
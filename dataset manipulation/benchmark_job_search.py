@@ -0,0 +1,64 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from jsonl_flatten import flatten_jsonl
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit'))
+from job_search import INDEX_COLUMNS, JobAdIndex, scan_pattern
+
+# Seeded synthetic ads in the JobTech layout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import generators
+
+# Number of synthetic ads; 2023.csv has roughly one million
+n_ads = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+# Selective queries like the one in String search CSV, then broad ones where
+# most rows are candidates and the index gains little
+queries = [
+    ('Remote: Älskar du Python/Django? Ansök via SSH!', 'exact', 'headline'),
+    ('Systemutvecklare Python 1234', 'word', 'headline'),
+    ('KÖKSCHEF', 'word', 'headline'),
+    ('Servitris', 'exact', 'headline'),
+    ('sjuksköt', 'exact', 'keywords_extracted_occupation_0'),
+    ('kollektivavtal erfarenhet', 'word', 'description_text'),
+]
+
+
+def scan(path, search_term, search_mode, search_column, print_column):
+    # The full-file scan String search CSV used to do for every query
+    pattern = scan_pattern(search_term, search_mode)
+    with open(path, 'r', encoding='utf-8') as csv_file:
+        return [row[print_column] for row in csv.DictReader(csv_file) if pattern.search(row[search_column])]
+
+
+with tempfile.TemporaryDirectory() as directory:
+    # Flattened like 2023.csv, with shorter descriptions than the real ads
+    jsonl_path = os.path.join(directory, 'synthetic_2023.jsonl')
+    path = os.path.join(directory, 'synthetic_2023.csv')
+    generators.write_job_ads(jsonl_path, n_ads, seed=42, description_words=60)
+    flatten_jsonl(jsonl_path, path)
+    os.remove(jsonl_path)
+    size_mb = os.path.getsize(path) / 1e6
+
+    start = time.perf_counter()
+    index = JobAdIndex.build(path, os.path.join(directory, 'index'), INDEX_COLUMNS)
+    print(f"Built the index over {n_ads} ads ({size_mb:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+    for search_term, search_mode, search_column in queries:
+        start = time.perf_counter()
+        expected = scan(path, search_term, search_mode, search_column, 'id')
+        scan_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = index.search(search_term, search_column, 'id', search_mode)
+        index_seconds = time.perf_counter() - start
+
+        assert found == expected, (search_term, search_mode)
+        print(f"{search_term!r} ({search_mode}, {search_column}): {len(found)} rows, "
+              f"scan {scan_seconds * 1000:.0f} ms, index {index_seconds * 1000:.1f} ms")
+
+    print("Identical results from the index and the scan")
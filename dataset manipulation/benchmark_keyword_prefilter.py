@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from job_clustering import FEATURE_FIELDS, KEYWORDS
+from jsonl_ingest import read_jsonl
+
+# Seeded synthetic ads in the JobTech layout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import generators
+
+# Number of synthetic ads; a full year of Platsbanken ads is roughly one million
+n_ads = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+with tempfile.TemporaryDirectory() as directory:
+    # About 5% of the ads are hospitality jobs, as in the yearly files
+    path = os.path.join(directory, 'synthetic_2023.jsonl')
+    generators.write_job_ads(path, n_ads, seed=42)
+    size_mb = os.path.getsize(path) / 1e6
+
+    columns = ['id', 'headline', 'publication_date']
+
+    results = {}
+    for prefilter in (False, True):
+        start = time.perf_counter()
+        results[prefilter] = read_jsonl(path, columns=columns, keywords=KEYWORDS, fields=FEATURE_FIELDS,
+                                        prefilter=prefilter)
+        seconds = time.perf_counter() - start
+        print(f"prefilter={prefilter}: {seconds:.2f}s ({n_ads / seconds:.0f} ads/s, {size_mb / seconds:.1f} MB/s), "
+              f"{len(results[prefilter])} matching ads")
+
+    pd.testing.assert_frame_equal(results[False], results[True])
+    print("Identical results with and without the prefilter")
@@ -1,6 +1,5 @@
 import pandas as pd
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.cluster import AgglomerativeClustering
+from job_clustering import JobAdClusterer
 
 # Definiera nyckelord för filtrering
 keywords = ['restaurang', 'kock', 'servitör', 'servitris', 'bartender', 'diskare', "hotell"]
@@ -16,19 +15,11 @@ data = pd.read_csv('2023.csv', encoding='utf-8', low_memory=False)
 # Filtrera och bearbeta data
 filtered_data = process_chunk(data)
 
-# One-Hot Encoding av data
-encoder = OneHotEncoder(sparse=False)
-encoded_data = encoder.fit_transform(filtered_data[['description_conditions','working_hours_type_label', 'duration_label', 'employment_type_0_label']])
-encoded_df = pd.DataFrame(encoded_data, columns=encoder.get_feature_names_out())
-
-# Standardisera data
-scaler = StandardScaler()
-scaled_features = scaler.fit_transform(encoded_df)
-
-# Agglomerative Clustering
-agg_cluster = AgglomerativeClustering(n_clusters=4)
-clusters = agg_cluster.fit_predict(scaled_features)
-filtered_data['cluster'] = clusters
+# Klustra på glesa one-hot-kodade kategorier med mini-batch k-means.
+# Minnet växer linjärt med antalet annonser, och den anpassade modellen kan
+# sedan märka nya annonser med clusterer.predict utan att anpassas om.
+clusterer = JobAdClusterer(['description_conditions','working_hours_type_label', 'duration_label', 'employment_type_0_label'], n_clusters=4)
+filtered_data['cluster'] = clusterer.fit_predict(filtered_data)
 
 # Spara resultatet
 output_file = 'filter_by_employ_23_restaurang.csv'
@@ -1,70 +1,35 @@
-import pandas as pd
-import json
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.cluster import AgglomerativeClustering
-
-# Definiera nyckelord för filtrering
-keywords = ['restaurang', 'kock', 'servitör', 'servitris', 'bartender', 'diskare', "hotell"]
-
-# Funktion för att extrahera säkert från JSON-struktur med listor
-def extract_label_from_list(data):
-    if isinstance(data, list) and len(data) > 0:
-        return data[0].get('label', None)
-    return None
-
-# Funktion för att extrahera säkert från direkt JSON-struktur
-def extract_label_from_dict(data):
-    if isinstance(data, dict):
-        return data.get('label', None)
-    return None
-
-def extract_conditions_from_dict(data):
-    if isinstance(data, dict):
-        return data.get('conditions', None)
-    return None
-
-# Funktion för att bearbeta en datachunk
-def process_chunk(chunk):
-    chunk_filtered = chunk[chunk['headline'].str.contains('|'.join(keywords), case=False, regex=True, na=False)].copy()
-    
-    chunk_filtered['description_conditions'] = chunk_filtered['description'].apply(extract_conditions_from_dict)
-    chunk_filtered['working_hours_type_label'] = chunk_filtered['working_hours_type'].apply(extract_label_from_dict)
-    chunk_filtered['duration_label'] = chunk_filtered['duration'].apply(extract_label_from_dict)
-    chunk_filtered['employment_type_label'] = chunk_filtered['employment_type'].apply(extract_label_from_list)
-    
-    return chunk_filtered
-
-# Initiera en tom lista för att lagra bearbetade chunks
-processed_data = []
-
-chunk_size = 5000
-with open('2023.jsonl', 'r', encoding='utf-8') as file:
-    chunk = []
-    for line in file:
-        chunk.append(json.loads(line))
-        if len(chunk) == chunk_size:
-            df_chunk = pd.DataFrame(chunk)
-            processed_data.append(process_chunk(df_chunk))
-            chunk = []
-    if chunk:
-        df_chunk = pd.DataFrame(chunk)
-        processed_data.append(process_chunk(df_chunk))
-
-filtered_df = pd.concat(processed_data, ignore_index=True)
-
-# One-Hot Encoding av data
-encoder = OneHotEncoder(sparse=False)
-encoded_data = encoder.fit_transform(filtered_df[['description_conditions','working_hours_type_label', 'duration_label', 'employment_type_label']])
-encoded_df = pd.DataFrame(encoded_data, columns=encoder.get_feature_names_out())
-
-# Standardisera data
-scaler = StandardScaler()
-scaled_features = scaler.fit_transform(encoded_df)
-
-# Agglomerative Clustering
-agg_cluster = AgglomerativeClustering(n_clusters=4)
-clusters = agg_cluster.fit_predict(scaled_features)
-filtered_df['cluster'] = clusters
+import os
+
+from job_clustering import FEATURE_FIELDS, KEYWORDS, JobAdClusterer
+from jsonl_ingest import read_jsonl
+
+# Sparad modell (kodare, skalning, klustermodell och klusternamn i en fil)
+model_path = 'job_clusterer.joblib'
+
+# Läs in, filtrera och extrahera etiketter parallellt över alla kärnor.
+# Bara filtrerade rader med de valda kolumnerna skickas tillbaka från arbetarprocesserna.
+filtered_df = read_jsonl(
+    '2023.jsonl',
+    columns=['id', 'headline', 'publication_date', 'last_publication_date', 'removed', 'removed_date'],
+    keywords=KEYWORDS,
+    fields=FEATURE_FIELDS,
+)
+
+# Klustra på glesa one-hot-kodade kategorier med mini-batch k-means.
+# Minnet växer linjärt med antalet annonser, och den anpassade modellen kan
+# sedan märka nya annonser med clusterer.predict utan att anpassas om.
+clusterer = JobAdClusterer(list(FEATURE_FIELDS), n_clusters=4)
+filtered_df['cluster'] = clusterer.fit_predict(filtered_df)
+
+# Behåll klusternamnen från den tidigare modellen så att t.ex. "Full-time" betyder samma sak efter omträning.
+# Efter första träningen heter klustren "Cluster 0" osv. och namnges för hand:
+#   clusterer = JobAdClusterer.load(model_path); clusterer.cluster_names = {0: 'Part-time', ...}; clusterer.save(model_path)
+if os.path.exists(model_path):
+    clusterer.inherit_names(JobAdClusterer.load(model_path), filtered_df)
+filtered_df['cluster_name'] = filtered_df['cluster'].map(clusterer.cluster_names)
+
+# Spara modellen så att nya annonser kan märkas med assign_new_ads.py utan omträning
+clusterer.save(model_path)
 
 # Spara resultatet
 output_file = 'filter_by_employ_23_restaurang.csv'
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import sklearn
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+# Hospitality ads that are clustered by employment type
+KEYWORDS = ['restaurang', 'kock', 'servitör', 'servitris', 'bartender', 'diskare', "hotell"]
+
+# Features extracted from each job ad, as read_jsonl field paths
+FEATURE_FIELDS = {
+    'description_conditions': 'description.conditions',
+    'working_hours_type_label': 'working_hours_type.label',
+    'duration_label': 'duration.label',
+    'employment_type_label': 'employment_type[0].label',
+}
+
+# Bumped whenever the layout of a saved model changes
+ARTIFACT_FORMAT = 1
+
+
+class JobAdClusterer:
+    """Clusters job ads on categorical columns with memory linear in the number of ads.
+
+    The one-hot features stay sparse, rare values (e.g. one-off free-text
+    conditions) are folded into one infrequent category per column, and the
+    clusters are found with mini-batch k-means. Fit once, then call `predict`
+    to label new ads with the same encoder and centroids.
+
+    `cluster_names` maps cluster IDs to names such as "Full-time". Names are
+    set by hand after the first fit and carried over to later refits with
+    `inherit_names`, so a name keeps meaning the same kind of ad even though
+    k-means numbers its clusters arbitrarily.
+    """
+
+    def __init__(self, feature_columns, n_clusters=4, max_categories=200, batch_size=4096, random_state=0):
+        self.feature_columns = list(feature_columns)
+        self.n_clusters = n_clusters
+        self.cluster_names = {i: f"Cluster {i}" for i in range(n_clusters)}
+        self.version = None
+        self.pipeline = make_pipeline(
+            OneHotEncoder(handle_unknown='infrequent_if_exist', max_categories=max_categories),
+            # Scaling without centering keeps the matrix sparse
+            StandardScaler(with_mean=False),
+            MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=3, random_state=random_state),
+        )
+
+    def _features(self, frame):
+        # Missing values become their own category
+        return frame[self.feature_columns].astype(object).fillna('').astype(str)
+
+    def fit(self, frame):
+        self.pipeline.fit(self._features(frame))
+        return self
+
+    def predict(self, frame):
+        return self.pipeline.predict(self._features(frame))
+
+    def fit_predict(self, frame):
+        return self.fit(frame).predict(frame)
+
+    def predict_names(self, frame):
+        return [self.cluster_names[cluster] for cluster in self.predict(frame)]
+
+    def inherit_names(self, previous, frame):
+        """Name the clusters after the previous model's names for their ads, one name per cluster.
+
+        The names are matched to the clusters so that the most ads keep the
+        name the previous model gave them, so no two clusters share a name.
+        Clusters left without a name (more clusters than names, or none of
+        their ads had the name they would get) are called "Cluster <n>".
+        """
+        names = sorted(set(previous.cluster_names.values()))
+        votes = np.zeros((self.n_clusters, len(names)), dtype=np.int64)
+        name_ids = {name: j for j, name in enumerate(names)}
+        np.add.at(votes, (self.predict(frame), [name_ids[name] for name in previous.predict_names(frame)]), 1)
+
+        rows, columns = linear_sum_assignment(-votes)
+        self.cluster_names = {int(cluster): names[j] for cluster, j in zip(rows, columns) if votes[cluster, j]}
+        taken = set(self.cluster_names.values())
+        for cluster in range(self.n_clusters):
+            if cluster not in self.cluster_names:
+                n = cluster
+                while f"Cluster {n}" in taken:
+                    n += 1
+                self.cluster_names[cluster] = f"Cluster {n}"
+                taken.add(f"Cluster {n}")
+        self.cluster_names = dict(sorted(self.cluster_names.items()))
+        return self
+
+    def save(self, path):
+        """Save the encoder, scaler, k-means model and cluster names as one file."""
+        self.version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        joblib.dump({
+            'format': ARTIFACT_FORMAT,
+            'version': self.version,
+            'sklearn_version': sklearn.__version__,
+            'clusterer': self,
+        }, path)
+
+    @staticmethod
+    def load(path):
+        artifact = joblib.load(path)
+        if artifact.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"{path} has model format {artifact.get('format')}, expected {ARTIFACT_FORMAT}")
+        if artifact['sklearn_version'] != sklearn.__version__:
+            print(f"Warning: {path} was saved with scikit-learn {artifact['sklearn_version']}, "
+                  f"running {sklearn.__version__}")
+        return artifact['clusterer']
+
+
+def assign_clusters(new_rows, model_path):
+    """Label new job ads with the cluster names of a saved model, without refitting.
+
+    `new_rows` must hold the feature columns the model was fitted on, e.g. as
+    returned by read_jsonl with FEATURE_FIELDS.
+    """
+    clusterer = JobAdClusterer.load(model_path)
+    return clusterer.predict_names(new_rows)
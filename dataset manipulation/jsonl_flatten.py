@@ -0,0 +1,224 @@
+import csv
+import json
+import os
+import pickle
+import tempfile
+import time
+
+
+def read_field_list(path):
+    """Read field names from a file such as 'All searchable column names'.
+
+    Accepts both plain lines ("headline") and numbered lines ("Column 6: headline").
+    """
+    fields = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if ':' in line:
+                line = line.split(':', 1)[1].strip()
+            fields.append(line)
+    return fields
+
+
+class FieldFilter:
+    """Allow-list of flattened field names.
+
+    A flattened column is kept when its name is in the list or lies inside a
+    listed field (e.g. 'employment_type_0_label' under 'employment_type').
+    Nested objects that cannot lead to a kept column are skipped without being
+    flattened.
+    """
+
+    def __init__(self, fields):
+        self.fields = set(fields)
+        self.prefixes = {name[:i] for name in self.fields for i in range(1, len(name) + 1)}
+
+    def _inside_field(self, name):
+        return any(name[:i] in self.fields for i, ch in enumerate(name) if ch == '_')
+
+    def keep(self, name):
+        return name in self.fields or self._inside_field(name)
+
+    def descend(self, prefix):
+        return prefix in self.prefixes or self._inside_field(prefix)
+
+
+def flatten_json(json_obj, prefix='', field_filter=None):
+    flat_data = {}
+    for key, value in json_obj.items():
+        if isinstance(value, dict):
+            if field_filter is None or field_filter.descend(prefix + key + '_'):
+                flat_data.update(flatten_json(value, prefix + key + '_', field_filter))
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, dict):
+                    if field_filter is None or field_filter.descend(prefix + key + f'_{index}_'):
+                        flat_data.update(flatten_json(item, prefix + key + f'_{index}_', field_filter))
+                elif field_filter is None or field_filter.keep(prefix + key + f'_{index}'):
+                    flat_data[prefix + key + f'_{index}'] = item
+        elif field_filter is None or field_filter.keep(prefix + key):
+            flat_data[prefix + key] = value
+    return flat_data
+
+
+class _SpillBuffer:
+    """Flattened rows spilled to a temporary file as pickled column batches.
+
+    With `arrow`, each batch's columns are converted to Arrow arrays as they
+    are spilled and the types seen per column are kept in `types`, so a
+    Parquet writer knows the schema without converting the batches twice.
+    """
+
+    def __init__(self, batch_size, arrow=False):
+        self.batch_size = batch_size
+        self.arrow = arrow
+        self.file = tempfile.TemporaryFile()
+        self.fieldnames = []
+        self.types = {}
+        self._known = set()
+        self.rows = []
+        self.batches = 0
+
+    def append(self, row):
+        for name in row:
+            if name not in self._known:
+                self._known.add(name)
+                self.fieldnames.append(name)
+        self.rows.append(row)
+        if len(self.rows) == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        names = {name for row in self.rows for name in row}
+        batch = {name: [row.get(name) for row in self.rows] for name in names}
+        if self.arrow:
+            batch = {name: _arrow_column(values) for name, values in batch.items()}
+            for name, column in batch.items():
+                self.types.setdefault(name, set()).add(column.type)
+        pickle.dump((len(self.rows), batch), self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.rows = []
+        self.batches += 1
+
+    def __iter__(self):
+        self.flush()
+        self.file.seek(0)
+        for _ in range(self.batches):
+            yield pickle.load(self.file)
+
+    def close(self):
+        self.file.close()
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    # Encode strings to handle encoding issues
+    if isinstance(value, str):
+        return value.encode('utf-8', 'ignore').decode('utf-8')
+    return value
+
+
+def _write_csv(spill, output_file):
+    with open(output_file, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(spill.fieldnames)
+        for n_rows, batch in spill:
+            columns = [batch.get(name, [None] * n_rows) for name in spill.fieldnames]
+            for values in zip(*columns):
+                csv_writer.writerow([_csv_value(v) for v in values])
+
+
+def _arrow_column(values):
+    import pyarrow as pa
+
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed value types within a column are stored as text
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _unified_type(types):
+    import pyarrow as pa
+
+    types = {t for t in types if not pa.types.is_null(t)}
+    if not types:
+        return pa.null()
+    if len(types) == 1:
+        return types.pop()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        return pa.float64()
+    return pa.string()
+
+
+def _write_parquet(spill, output_file):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # The schema evolves as new fields appear; every batch is widened to the
+    # union of all fields, with types promoted across batches. The spill
+    # already holds Arrow arrays and their types, so it is read only once.
+    spill.flush()
+    schema = pa.schema([(name, _unified_type(spill.types.get(name, ()))) for name in spill.fieldnames])
+
+    with pq.ParquetWriter(output_file, schema) as writer:
+        for n_rows, batch in spill:
+            arrays = []
+            for field in schema:
+                column = batch.get(field.name)
+                if column is None:
+                    arrays.append(pa.nulls(n_rows, type=field.type))
+                    continue
+                if column.type != field.type:
+                    if pa.types.is_string(field.type):
+                        column = pa.array([None if v is None else str(v) for v in column.to_pylist()],
+                                          type=pa.string())
+                    else:
+                        column = column.cast(field.type)
+                arrays.append(column)
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def flatten_jsonl(input_file, output_file, fields=None, batch_size=10000):
+    """Flatten a JSONL file to CSV or Parquet (chosen by the output extension).
+
+    Every line is parsed and flattened exactly once. The set of columns is
+    discovered while the rows are spilled to a temporary buffer, which is then
+    written out with the complete header. `fields` is an optional allow-list of
+    flattened field names. Returns throughput statistics.
+    """
+    field_filter = FieldFilter(fields) if fields else None
+    spill = _SpillBuffer(batch_size, arrow=output_file.endswith('.parquet'))
+    start = time.perf_counter()
+    n_rows = 0
+    try:
+        with open(input_file, 'r', encoding='utf-8') as jsonl_file:
+            for line in jsonl_file:
+                if not line.strip():
+                    continue
+                spill.append(flatten_json(json.loads(line), field_filter=field_filter))
+                n_rows += 1
+        parse_seconds = time.perf_counter() - start
+
+        if output_file.endswith('.parquet'):
+            _write_parquet(spill, output_file)
+        else:
+            _write_csv(spill, output_file)
+    finally:
+        spill.close()
+
+    seconds = time.perf_counter() - start
+    megabytes = os.path.getsize(input_file) / 1e6
+    return {
+        'rows': n_rows,
+        'columns': len(spill.fieldnames),
+        'parse_seconds': parse_seconds,
+        'seconds': seconds,
+        'rows_per_second': n_rows / seconds if seconds else 0.0,
+        'mb_per_second': megabytes / seconds if seconds else 0.0,
+    }
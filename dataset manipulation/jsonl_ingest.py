@@ -0,0 +1,263 @@
+import json
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    # orjson decodes bytes directly and is several times faster than json
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Upper bound on the bytes one worker reads into memory at a time
+SHARD_BYTES = 64 * 1024 * 1024
+
+
+# One step of a field path: a key, or a list index in brackets
+_PATH_STEP = re.compile(r'([^.\[\]]+)|\[(-?\d+)\]')
+
+
+def parse_field_path(path):
+    """Split a path like "employment_type[0].label" into keys and list indices."""
+    steps = []
+    position = 0
+    for match in _PATH_STEP.finditer(path):
+        key, index = match.groups()
+        # Keys after the first are joined with dots; indices follow directly
+        separator = '.' if key is not None and steps else ''
+        if path[position:match.start()] != separator or (index is not None and not steps):
+            raise ValueError(f"Invalid field path {path!r}")
+        steps.append(key if key is not None else int(index))
+        position = match.end()
+    if not steps or position != len(path):
+        raise ValueError(f"Invalid field path {path!r}")
+    return tuple(steps)
+
+
+def _lookup(value, step):
+    # One step of a path; a missing key, an index out of range or a value of the wrong type gives None
+    if type(step) is int:
+        return value[step] if type(value) is list and -len(value) <= step < len(value) else None
+    return value.get(step) if type(value) is dict else None
+
+
+def _path_getter(path):
+    """A function returning the value at `path` in a decoded record, or None.
+
+    The usual shapes of job ad fields ("key", "key.key" and "key[0].key")
+    get a closure doing the lookups inline; longer paths walk their steps.
+    """
+    steps = parse_field_path(path)
+    shape = tuple(type(step) for step in steps)
+    if shape == (str,):
+        key, = steps
+
+        def get(record):
+            return record.get(key) if type(record) is dict else None
+    elif shape == (str, str):
+        key, inner = steps
+
+        def get(record):
+            value = record.get(key) if type(record) is dict else None
+            return value.get(inner) if type(value) is dict else None
+    elif shape == (str, int, str) and steps[1] >= 0:
+        key, index, inner = steps
+
+        def get(record):
+            value = record.get(key) if type(record) is dict else None
+            value = value[index] if type(value) is list and index < len(value) else None
+            return value.get(inner) if type(value) is dict else None
+    else:
+        def get(record):
+            value = record
+            for step in steps:
+                value = _lookup(value, step)
+            return value
+    return get
+
+
+def _field_getter(paths):
+    # The first non-null value of the paths, tried in order
+    getters = [_path_getter(path) for path in ([paths] if isinstance(paths, str) else paths)]
+    if len(getters) == 1:
+        return getters[0]
+
+    def get(record):
+        for getter in getters:
+            value = getter(record)
+            if value is not None:
+                return value
+        return None
+    return get
+
+
+class FieldProjection:
+    """Extracts nested values from decoded records by declarative paths.
+
+    `fields` maps output columns to paths such as "working_hours_type.label"
+    or "employment_type[0].label". A tuple of paths is tried in order and the
+    first non-null value is used, e.g. ("occupation[0].label",
+    "occupation.label") for a field that is either a list of concepts or a
+    single concept. A path that runs into a missing key, an index out of
+    range or a value of the wrong type gives None.
+
+    Each field is parsed once into a closure (see _path_getter), so extracting
+    a record's fields is one call per field with no parsing.
+    """
+
+    def __init__(self, fields):
+        self.fields = dict(fields)
+        self._getters = [(name, _field_getter(paths)) for name, paths in self.fields.items()]
+
+    def __call__(self, record, row=None):
+        row = {} if row is None else row
+        for name, get in self._getters:
+            row[name] = get(record)
+        return row
+
+
+def byte_ranges(path, n_shards):
+    """Split a file into `n_shards` byte ranges that start and end on line boundaries."""
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, n_shards):
+            f.seek(max(size * i // n_shards, boundaries[-1]))
+            f.readline()
+            position = min(f.tell(), size)
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    if boundaries[-1] != size:
+        boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+# The JSON string following a "headline" key
+_HEADLINE_VALUE = re.compile(rb'\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def _candidate_lines(data, pattern):
+    """Yield the lines of `data` whose raw "headline" value matches `pattern`.
+
+    Only the headline strings are decoded; every other line is skipped without
+    being split out or parsed. A line with a matching top-level headline is
+    always yielded. Lines where the match is in a nested "headline" key are
+    yielded as well, so callers must check the parsed headline again.
+    """
+    key = b'"headline"'
+    position = data.find(key)
+    while position != -1:
+        match = _HEADLINE_VALUE.match(data, position + len(key))
+        if match is None:
+            # null/non-string value, or the text was not a key after all
+            position = data.find(key, position + len(key))
+            continue
+        if pattern.search(_loads(match.group(1))):
+            line_start = data.rfind(b'\n', 0, position) + 1
+            line_end = data.find(b'\n', match.end())
+            if line_end == -1:
+                line_end = len(data)
+            yield data[line_start:line_end]
+            position = data.find(key, line_end)
+        else:
+            position = data.find(key, match.end())
+
+
+def _parse_shard(path, start, end, columns, keywords, fields, prefilter):
+    pattern = re.compile('|'.join(keywords), flags=re.IGNORECASE) if keywords else None
+    projection = FieldProjection(fields) if fields else None
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # With a keyword filter, match the raw headlines first and parse only the
+    # lines that can qualify
+    lines = _candidate_lines(data, pattern) if pattern is not None and prefilter else data.splitlines()
+
+    rows = []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = _loads(line)
+
+        if pattern is not None:
+            headline = record.get('headline')
+            if not isinstance(headline, str) or not pattern.search(headline):
+                continue
+
+        row = record if columns is None else {col: record.get(col) for col in columns}
+        if projection is not None:
+            projection(record, row)
+        rows.append(row)
+    return rows
+
+
+def _shard_tasks(path, columns, keywords, fields, prefilter, processes):
+    size = os.path.getsize(path)
+    n_shards = max(processes * 4, -(-size // SHARD_BYTES), 1)
+    return [(path, start, end, columns, keywords, fields, prefilter) for start, end in byte_ranges(path, n_shards)]
+
+
+def _parsed_shards(tasks, processes):
+    """Parsed rows of each shard, in file order, with at most 2 * `processes` shards held at once."""
+    # Workers are forked: the scripts using this module run at top level, so
+    # spawned workers would re-run them. Without fork the shards are parsed here.
+    if processes > 1 and len(tasks) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('fork')) as executor:
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(_parse_shard, *task))
+                if len(pending) >= 2 * processes:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    else:
+        for task in tasks:
+            yield _parse_shard(*task)
+
+
+def _shard_frame(rows, columns, fields):
+    if columns is not None:
+        return pd.DataFrame.from_records(rows, columns=list(columns) + list(fields or {}))
+    return pd.DataFrame.from_records(rows)
+
+
+def read_jsonl(path, columns=None, keywords=None, fields=None, processes=None, prefilter=True):
+    """Read a JSONL file of job ads into a DataFrame using all CPU cores.
+
+    The file is split into newline-aligned byte ranges that are parsed in a
+    process pool. Inside the workers, rows are filtered on `keywords` (case
+    insensitive match against `headline`, as in process_chunk), projected to
+    `columns` (None keeps every top-level field) and extended with `fields`,
+    a dict of new column -> nested field path (see FieldProjection) that is
+    extracted while the record is decoded. Only the resulting rows are sent
+    back to the main process.
+
+    With `prefilter`, the combined keyword pattern is first run on the raw
+    headline strings of the shard and only candidate lines are parsed; the
+    result is the same as without it, since candidates are checked again on
+    the parsed headline.
+    """
+    processes = processes or os.cpu_count() or 1
+    tasks = _shard_tasks(path, columns, keywords, fields, prefilter, processes)
+    rows = [row for shard in _parsed_shards(tasks, processes) for row in shard]
+    return _shard_frame(rows, columns, fields)
+
+
+def iter_jsonl(path, columns=None, keywords=None, fields=None, processes=None, prefilter=True):
+    """Like read_jsonl, but yield one DataFrame per shard, in file order.
+
+    Only a few shards are in memory at a time, so files far larger than
+    memory can be streamed to disk. A shard holds at most SHARD_BYTES of the
+    file.
+    """
+    processes = processes or os.cpu_count() or 1
+    tasks = _shard_tasks(path, columns, keywords, fields, prefilter, processes)
+    for rows in _parsed_shards(tasks, processes):
+        yield _shard_frame(rows, columns, fields)
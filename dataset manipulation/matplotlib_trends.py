@@ -13,20 +13,12 @@ df = df[df['publication_date'] >= '2023-01-01']
 # Extrahera månad och år för gruppering
 df['year_month'] = df['publication_date'].dt.to_period('M')
 
-# Gruppera data efter kluster och månad
-clustered_trends = df.groupby(['cluster', 'year_month']).size().reset_index(name='count')
-
-# Byt namn på klusternumren till etiketter
-cluster_labels = {
-    0: "Deltid",
-    1: "Heltid",
-    2: "Sommarjobb",
-    3: "Behovsanställning"
-}
-clustered_trends['cluster'] = clustered_trends['cluster'].map(cluster_labels)
+# Gruppera data efter klusternamn och månad. Namnen skrivs av cluster_json.py och
+# följer med vid omträning, så de stämmer även när klusternumren ändras.
+clustered_trends = df.groupby(['cluster_name', 'year_month']).size().reset_index(name='count')
 
 # Pivotera data för att få klustren som separata kolumner
-trend_pivot = clustered_trends.pivot(index='year_month', columns='cluster', values='count').fillna(0)
+trend_pivot = clustered_trends.pivot(index='year_month', columns='cluster_name', values='count').fillna(0)
 
 # Plot
 plt.figure(figsize=(10, 6))
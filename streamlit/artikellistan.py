@@ -0,0 +1,380 @@
+import functools
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the Artikellistan workbooks (same folder as the app)
+DATA_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Converted Parquet files and their manifests are kept next to the workbooks
+CACHE_DIR = os.path.join(DATA_DIR, ".artikellistan_cache")
+
+# Columns the dashboard actually uses, read by default
+DEFAULT_COLUMNS = ['Producentnamn', 'Kvittonamn', 'Försäljning i liter', 'Varugrupp detalj']
+
+# Low-cardinality text columns that are stored dictionary-encoded
+CATEGORICAL_COLUMNS = [
+    'Producentnamn', 'Varugrupp', 'Varugrupp detalj', 'Rubrik', 'Buteljtyp',
+    'Land', 'Region', 'Ursprung', 'Ekologisk', 'Etiskt',
+]
+
+
+def workbook_path(year):
+    return os.path.join(DATA_DIR, f"Artikellistan {year}.xlsx")
+
+
+def _manifest_path(year):
+    return os.path.join(CACHE_DIR, f"Artikellistan {year}.json")
+
+
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(year):
+    """Return the sha256 of the workbook for `year`.
+
+    The hash is only recomputed when the file's mtime or size differs from the
+    one recorded in the manifest, so an unchanged workbook costs a single stat.
+    """
+    file_path = workbook_path(year)
+    stat = os.stat(file_path)
+
+    manifest = _read_manifest(year)
+    if manifest and manifest['mtime_ns'] == stat.st_mtime_ns and manifest['size'] == stat.st_size:
+        return manifest['sha256']
+
+    sha256 = _file_sha256(file_path)
+    if manifest and manifest['sha256'] == sha256:
+        # Touched but unchanged: record the new mtime so the next call skips hashing
+        try:
+            _write_manifest(year, sha256)
+        except OSError:
+            pass
+    return sha256
+
+
+def _read_manifest(year):
+    try:
+        with open(_manifest_path(year), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(year, sha256):
+    stat = os.stat(workbook_path(year))
+    manifest = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': sha256}
+    tmp_path = _manifest_path(year) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path(year))
+
+
+def _parquet_path(year, sha256):
+    return os.path.join(CACHE_DIR, f"Artikellistan {year}-{sha256[:16]}.parquet")
+
+
+def read_workbook(year):
+    """Parse the raw workbook and apply the column types used in the cache."""
+    data = pd.read_excel(workbook_path(year), header=4)
+    for col in CATEGORICAL_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('category')
+    if 'Försäljning i liter' in data.columns:
+        data['Försäljning i liter'] = pd.to_numeric(data['Försäljning i liter'], errors='coerce')
+    return data
+
+
+def convert_workbook(year, sha256=None):
+    """Convert the workbook for `year` to Parquet and return the Parquet path."""
+    if sha256 is None:
+        sha256 = _file_sha256(workbook_path(year))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    parquet_path = _parquet_path(year, sha256)
+    data = read_workbook(year)
+    tmp_path = parquet_path + ".tmp"
+    data.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    _write_manifest(year, sha256)
+
+    # Drop Parquet files converted from older versions of the same workbook
+    prefix = f"Artikellistan {year}-"
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and name.endswith(".parquet") and os.path.join(CACHE_DIR, name) != parquet_path:
+            os.remove(os.path.join(CACHE_DIR, name))
+    return parquet_path
+
+
+def load_artikellista(year, columns=DEFAULT_COLUMNS):
+    """Load the Artikellistan for `year`, converting the workbook on first use.
+
+    Pass `columns=None` to read every column of the workbook. Whenever
+    `Producentnamn` is loaded, a categorical `producer_group` column from the
+    brewery group registry is attached as well.
+    """
+    sha256 = source_fingerprint(year)
+    parquet_path = _parquet_path(year, sha256)
+
+    if not os.path.exists(parquet_path):
+        try:
+            convert_workbook(year, sha256)
+        except OSError:
+            # Read-only deployment: fall back to parsing the workbook directly
+            data = read_workbook(year)
+            return _with_producer_group(data if columns is None else data[list(columns)].copy())
+
+    return _with_producer_group(pd.read_parquet(parquet_path, columns=None if columns is None else list(columns)))
+
+
+def _with_producer_group(data):
+    if 'Producentnamn' in data.columns:
+        data['producer_group'] = producer_groups(data['Producentnamn'])
+    return data
+
+
+def _convert_timed(year, sha256):
+    start = time.perf_counter()
+    convert_workbook(year, sha256)
+    return time.perf_counter() - start
+
+
+def _concat_years(frames):
+    # Give categorical columns the union of every year's categories so the
+    # concatenated frame stays dictionary-encoded instead of falling back to object
+    for col in frames[0].columns:
+        if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = pd.api.types.union_categoricals([frame[col] for frame in frames]).categories
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def convert_missing(years, max_workers=None):
+    """Convert every workbook in `years` that is not in the Parquet cache yet.
+
+    The conversions run in parallel in a process pool. Returns the conversion
+    time in seconds for each converted year.
+    """
+    timings = {}
+    missing = {}
+    for year in years:
+        sha256 = source_fingerprint(year)
+        if not os.path.exists(_parquet_path(year, sha256)):
+            missing[year] = sha256
+
+    # Workers are forked: spawned workers would re-run the Streamlit script,
+    # which Streamlit registers as __main__. Without fork the workbooks are
+    # converted one by one when they are first loaded.
+    if len(missing) > 1 and "fork" in multiprocessing.get_all_start_methods():
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(len(missing), max_workers or os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                futures = {year: executor.submit(_convert_timed, year, sha256) for year, sha256 in missing.items()}
+                for year, future in futures.items():
+                    timings[year] = future.result()
+        except OSError:
+            # Read-only deployment: load_artikellista parses the workbooks itself
+            pass
+    return timings
+
+
+def load_years(years, columns=DEFAULT_COLUMNS, max_workers=None):
+    """Load several years into one frame with a `Year` column.
+
+    Workbooks that are not in the Parquet cache yet are parsed in parallel in a
+    process pool, filling the same cache that `load_artikellista` reads from.
+    Per-year load times in seconds are logged and stored in
+    `data.attrs['load_timings']`.
+    """
+    timings = convert_missing(years, max_workers=max_workers)
+
+    frames = []
+    for year in years:
+        start = time.perf_counter()
+        data = load_artikellista(year, columns=columns)
+        timings[year] = timings.get(year, 0.0) + time.perf_counter() - start
+        data['Year'] = year
+        frames.append(data)
+
+    for year in years:
+        logger.info("Loaded Artikellistan %s in %.2fs", year, timings[year])
+
+    combined = _concat_years(frames)
+    combined.attrs['load_timings'] = timings
+    return combined
+
+
+def producer_history(producer, years, columns=('Kvittonamn', 'Varugrupp detalj', 'Försäljning i liter')):
+    """Return one producer's rows for every year in `years`, with a `Year` column.
+
+    Rows are filtered while reading the Parquet files, so the full article
+    lists are never materialized.
+    """
+    convert_missing(years)
+
+    frames = []
+    for year in years:
+        parquet_path = _parquet_path(year, source_fingerprint(year))
+        if os.path.exists(parquet_path):
+            data = pd.read_parquet(parquet_path, columns=list(columns), filters=[('Producentnamn', '==', producer)])
+        else:
+            data = load_artikellista(year, columns=None)
+            data = data.loc[data['Producentnamn'] == producer, list(columns)]
+        data = data.assign(Year=year)
+        frames.append(data)
+
+    history = _concat_years(frames)
+    # The slice is small; plain strings keep it cheap to filter and hash
+    for col in history.select_dtypes('category').columns:
+        history[col] = history[col].astype(object)
+    return history
+
+
+# Registry of the producer groups compared in the market share tab. Each group
+# maps a brewery to the alternate names it appears under in the Artikellistan;
+# new groups can be added to the file without code changes.
+BREWERY_GROUPS_PATH = os.path.join(DATA_DIR, "brewery_groups.json")
+
+# Group assigned to every producer that is not listed in the registry
+OTHER_GROUP = 'Other Producers'
+
+
+@functools.lru_cache(maxsize=4)
+def _compile_brewery_groups(path, mtime_ns):
+    with open(path, "r", encoding="utf-8") as f:
+        registry = json.load(f)
+    groups = list(registry) + [OTHER_GROUP]
+    alias_to_code = {
+        alias: code
+        for code, breweries in enumerate(registry.values())
+        for aliases in breweries.values()
+        for alias in aliases
+    }
+    return groups, alias_to_code
+
+
+def _brewery_registry():
+    return _compile_brewery_groups(BREWERY_GROUPS_PATH, os.stat(BREWERY_GROUPS_PATH).st_mtime_ns)
+
+
+def brewery_groups():
+    """Return the registered group names in file order, followed by OTHER_GROUP."""
+    groups, _ = _brewery_registry()
+    return list(groups)
+
+
+def producer_groups(producers):
+    """Map a Series of producer names to a categorical `producer_group` Series.
+
+    The registry lookup runs once per distinct producer name; rows are then
+    assigned through an integer code -> group array.
+    """
+    groups, alias_to_code = _brewery_registry()
+    producers = producers.astype('category')
+    other = len(groups) - 1
+
+    # One entry per producer category, plus a trailing entry that catches
+    # missing producer names (category code -1)
+    code_to_group = np.array(
+        [alias_to_code.get(name, other) for name in producers.cat.categories] + [other],
+        dtype=np.int16,
+    )
+    codes = code_to_group[producers.cat.codes.to_numpy()]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=groups),
+        index=producers.index,
+        name='producer_group',
+    )
+
+
+def sales_cube_version(years):
+    """Return a key that changes whenever any source workbook or the groups change."""
+    digest = hashlib.sha256()
+    for year in years:
+        digest.update(f"{year}:{source_fingerprint(year)};".encode())
+    with open(BREWERY_GROUPS_PATH, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def build_sales_cube(years):
+    """Aggregate liters sold per (Year, Varugrupp detalj, producer_group)."""
+    data = load_years(years, columns=['Producentnamn', 'Varugrupp detalj', 'Försäljning i liter'])
+    cube = data.groupby(
+        ['Year', data['Varugrupp detalj'].astype(object), 'producer_group'],
+        dropna=False,
+        observed=True,
+    )['Försäljning i liter'].sum()
+    cube.index.names = ['Year', 'Varugrupp detalj', 'producer_group']
+    cube = cube.reset_index()
+    cube['producer_group'] = cube['producer_group'].astype(object)
+    return cube
+
+
+def load_sales_cube(years):
+    """Load the sales cube for `years`, rebuilding it only when a source has changed."""
+    cube_path = os.path.join(CACHE_DIR, f"sales_cube-{sales_cube_version(years)[:16]}.parquet")
+    if os.path.exists(cube_path):
+        return pd.read_parquet(cube_path)
+
+    cube = build_sales_cube(years)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for name in os.listdir(CACHE_DIR):
+            if name.startswith("sales_cube-"):
+                os.remove(os.path.join(CACHE_DIR, name))
+        cube.to_parquet(cube_path + ".tmp", index=False)
+        os.replace(cube_path + ".tmp", cube_path)
+    except OSError:
+        pass
+    return cube
+
+
+# Beer categories compared in the market share tab
+BEER_CATEGORIES = ["Lageröl", "Säsongsöl", "Specialöl"]
+
+
+def market_share_changes(cube, years, categories=BEER_CATEGORIES):
+    """Yearly change in liters sold per producer group, from a sales cube.
+
+    Returns one row per year with a '<group> Change %' column per registered
+    group (OTHER_GROUP is labelled 'Total Market') and a '<group> Sales'
+    column per group. The change is 0 for the first year and whenever the
+    previous year had no sales.
+    """
+    groups = brewery_groups()
+    category_sales = cube[cube['Varugrupp detalj'].isin(categories)]
+
+    # Year x producer group table of liters sold in the categories
+    sales = (
+        category_sales.groupby(['Year', 'producer_group'])['Försäljning i liter'].sum()
+        .unstack(fill_value=0)
+        .reindex(index=years, columns=groups, fill_value=0)
+    )
+    change = (sales.pct_change(fill_method=None) * 100).where(sales.shift() > 0, 0)
+
+    # Producers outside the registry make up the total market
+    results = pd.DataFrame({'Year': years})
+    for group in groups:
+        name = 'Total Market' if group == OTHER_GROUP else group
+        results[f'{name} Change %'] = change[group].values
+    for group in groups:
+        results[f'{group} Sales'] = sales[group].values
+    return results
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+
+def _value_ranks(values):
+    """Sort rank of each value, or keep the given order for values that cannot be ordered."""
+    try:
+        order = np.argsort(values, kind='stable')
+    except TypeError:
+        # Mixed types, e.g. numbers and text in one column
+        order = np.arange(len(values))
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values))
+    return ranks
+
+
+def _pair_counts(cluster_codes, n_clusters, codes, n_values):
+    """(cluster, value code, count) for every pair that occurs."""
+    keys = cluster_codes.astype(np.int64) * n_values + codes
+    if n_clusters * n_values <= 4 * len(keys):
+        counts = np.bincount(keys, minlength=n_clusters * n_values)
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(keys, return_counts=True)
+    cluster_ids, value_codes = np.divmod(keys, n_values)
+    return cluster_ids, value_codes, counts
+
+
+def _top_values(cluster_codes, clusters, column, values, top_n):
+    codes, uniques = pd.factorize(values)
+    present = codes >= 0
+    cluster_ids, value_codes, counts = _pair_counts(cluster_codes[present], len(clusters), codes[present], len(uniques))
+
+    # Only pairs counted at least as often as their cluster's top_n-th value can
+    # make the cut, so ties are broken (by the smallest value, as in
+    # Series.mode) among those candidates rather than over every unique value
+    most = counts.max(initial=0) + 1
+    order = np.argsort(cluster_ids * most + (most - 1 - counts), kind='stable')
+    starts = np.searchsorted(cluster_ids[order], np.arange(len(clusters)), side='left')
+    ends = np.searchsorted(cluster_ids[order], np.arange(len(clusters)), side='right')
+    threshold = np.zeros(len(clusters), dtype=counts.dtype)
+    has_values = ends > starts
+    threshold[has_values] = counts[order][np.minimum(starts + top_n, ends)[has_values] - 1]
+    candidates = counts >= threshold[cluster_ids]
+    cluster_ids, value_codes, counts = cluster_ids[candidates], value_codes[candidates], counts[candidates]
+
+    candidate_codes, inverse = np.unique(value_codes, return_inverse=True)
+    ranks = _value_ranks(uniques[candidate_codes])[inverse]
+    order = np.lexsort((ranks, -counts, cluster_ids))
+    cluster_ids, value_codes, counts = cluster_ids[order], value_codes[order], counts[order]
+    rank = np.arange(len(cluster_ids)) - np.searchsorted(cluster_ids, cluster_ids, side='left')
+    keep = rank < top_n
+
+    totals = np.bincount(cluster_codes[present], minlength=len(clusters))
+    return pd.DataFrame({
+        'cluster': clusters[cluster_ids[keep]],
+        'column': column,
+        'rank': rank[keep] + 1,
+        'value': uniques[value_codes[keep]],
+        'count': counts[keep],
+        'share': counts[keep] / totals[cluster_ids[keep]],
+    })
+
+
+def profile_clusters(df, cluster_column='cluster', columns=None, top_n=3):
+    """Profile every cluster over `columns` (default: all other columns).
+
+    Works on integer codes: the cluster IDs and each column's values are
+    factorized once, and the counts of every (cluster, value) pair come from
+    one bincount (or np.unique, for high-cardinality columns) over the
+    combined codes, so the cost is one pass per column however many clusters
+    there are. Cluster IDs can be any values.
+
+    Returns a dict of tidy tables:
+
+    - 'sizes': cluster, count
+    - 'top_values': cluster, column, rank, value, count, share for the
+      `top_n` most frequent non-missing values (rank 1 is the mode)
+    - 'numeric': cluster, column, count, mean, std, min, median, max for
+      numeric columns
+    """
+    if cluster_column not in df.columns:
+        raise KeyError(f"The DataFrame must contain a '{cluster_column}' column.")
+    columns = [col for col in (columns or df.columns) if col != cluster_column and col in df.columns]
+
+    cluster_codes, clusters = pd.factorize(df[cluster_column], sort=True)
+    has_cluster = cluster_codes >= 0
+    data = df[columns] if has_cluster.all() else df.loc[has_cluster, columns]
+    cluster_codes = cluster_codes[has_cluster]
+
+    sizes = pd.DataFrame({'cluster': clusters, 'count': np.bincount(cluster_codes, minlength=len(clusters))})
+    top_values = pd.concat(
+        [_top_values(cluster_codes, clusters, col, data[col], top_n) for col in columns],
+        ignore_index=True,
+    ) if columns else pd.DataFrame(columns=['cluster', 'column', 'rank', 'value', 'count', 'share'])
+
+    numeric_columns = [col for col in columns if pd.api.types.is_numeric_dtype(data[col])
+                       and not pd.api.types.is_bool_dtype(data[col])]
+    if numeric_columns:
+        numeric = data[numeric_columns].groupby(clusters[cluster_codes]).agg(['count', 'mean', 'std', 'min', 'median', 'max'])
+        numeric = numeric.stack(level=0, future_stack=True).rename_axis(['cluster', 'column']).reset_index()
+    else:
+        numeric = pd.DataFrame(columns=['cluster', 'column', 'count', 'mean', 'std', 'min', 'median', 'max'])
+
+    return {'sizes': sizes, 'top_values': top_values, 'numeric': numeric}
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from instrumentation import span
+
+# Directory holding the app's data (same folder as the app)
+DATA_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Finished figures as compact JSON, one file per figure and set of parameters
+CACHE_DIR = os.path.join(DATA_DIR, ".figure_cache")
+
+# Figures kept in memory, shared by every session
+MAX_FIGURES = 64
+
+_figures = OrderedDict()
+_lock = threading.Lock()
+
+
+def file_fingerprint(paths):
+    """(name, mtime, size) of each input file; changes whenever a file is replaced or edited."""
+    fingerprint = []
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint.append((os.path.basename(path), stat.st_mtime_ns, stat.st_size))
+    return fingerprint
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _remember(key, figure):
+    with _lock:
+        _figures[key] = figure
+        _figures.move_to_end(key)
+        while len(_figures) > MAX_FIGURES:
+            _figures.popitem(last=False)
+
+
+def cached_figure(name, build, paths=(), params=None, version=1):
+    """Return the Plotly figure `build()` makes, building it only when its inputs change.
+
+    The figure is keyed by the fingerprints of the input files `paths`, the
+    JSON-serializable `params` it was built for, and `version`, which is bumped
+    when the figure code changes. Figures are kept in memory and as compact
+    JSON in CACHE_DIR, so a restarted server reads the JSON instead of
+    rebuilding. The returned figure is shared: do not modify it.
+    """
+    inputs = _digest([version, file_fingerprint(paths)])
+    key = f"{name}-{inputs}-{_digest(params)}"
+    with span(f'figure.{name}') as record:
+        with _lock:
+            figure = _figures.get(key)
+        if figure is not None:
+            record['cache'] = 'hit'
+            return figure
+
+        path = os.path.join(CACHE_DIR, f"{key}.json")
+        if os.path.exists(path):
+            record['cache'] = 'disk'
+            with open(path, "r", encoding="utf-8") as f:
+                figure = pio.from_json(f.read())
+        else:
+            record['cache'] = 'miss'
+            figure = build()
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    f.write(figure.to_json())
+                os.replace(path + ".tmp", path)
+                # Drop this figure's files built from older inputs; other parameters stay
+                for stale in os.listdir(CACHE_DIR):
+                    if stale.startswith(f"{name}-") and not stale.startswith(f"{name}-{inputs}-"):
+                        os.remove(os.path.join(CACHE_DIR, stale))
+            except OSError:
+                # Read-only deployment: keep the figure in memory only
+                pass
+        _remember(key, figure)
+        return figure
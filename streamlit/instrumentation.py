@@ -0,0 +1,176 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+try:
+    # Peak resident memory of the process; not available on Windows
+    import resource
+except ImportError:
+    resource = None
+
+# One JSON line per rerun. Set TAPTRACK_PERF_LOG to a file path to write the
+# lines there; otherwise they go to stderr with the server's own output.
+logger = logging.getLogger(__name__)
+PERF_LOG = os.environ.get("TAPTRACK_PERF_LOG")
+
+if not logger.handlers:
+    logger.addHandler(logging.FileHandler(PERF_LOG) if PERF_LOG else logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Streamlit runs each session's script in its own thread, so every rerun
+# collects its spans in thread-local state
+_local = threading.local()
+
+# Cache hits and misses per cached function, shared by all sessions
+_cache_counts = {}
+_counts_lock = threading.Lock()
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _spans():
+    if not hasattr(_local, 'spans'):
+        _local.spans = []
+        _local.depth = 0
+    return _local.spans
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block and record it in the current rerun.
+
+    Each record holds the wall time in ms, how much the process's peak memory
+    grew during the block (peak_mb_delta, 0 unless the block set a new peak),
+    the nesting depth, and `cache` ('hit' or 'miss') for cached calls. Records
+    are kept in the order the spans start, so nested spans follow their parent.
+    """
+    spans = _spans()
+    record = {'name': name, 'depth': _local.depth}
+    spans.append(record)
+    _local.depth += 1
+    peak_before = peak_rss_mb()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['ms'] = round((time.perf_counter() - started) * 1000, 2)
+        if peak_before is not None:
+            record['peak_mb_delta'] = round(peak_rss_mb() - peak_before, 1)
+        _local.depth -= 1
+
+
+def timed(name):
+    """Decorator recording every call of the function as a span."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def cached(name, cache, **options):
+    """Cache the function with `cache` (st.cache_data or st.cache_resource) and record calls as spans.
+
+    `options` are passed on to `cache`. The function body only runs on a cache
+    miss, so a flag set from inside the cached function tells hits from misses.
+    Hits and misses are also counted per function for the whole server process
+    (see cache_counts).
+
+    The "Running ..." spinner is shown here rather than by `cache`, so calls
+    made while warming (see warming) can skip it: a background thread must not
+    draw on the page or leave a spinner in the replay of an enclosing cached call.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            _local.cache_miss = True
+            return fn(*args, **kwargs)
+
+        cached_fn = cache(show_spinner=False, **options)(body)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            outer = getattr(_local, 'cache_miss', False)
+            _local.cache_miss = False
+            try:
+                with span(name) as record:
+                    if getattr(_local, 'warming', False):
+                        result = cached_fn(*args, **kwargs)
+                    else:
+                        with st.spinner(f"Running `{fn.__qualname__}({'...' if args or kwargs else ''})`."):
+                            result = cached_fn(*args, **kwargs)
+                    record['cache'] = 'miss' if _local.cache_miss else 'hit'
+            finally:
+                _local.cache_miss = outer
+            with _counts_lock:
+                counts = _cache_counts.setdefault(name, {'hit': 0, 'miss': 0})
+                counts[record['cache']] += 1
+            return result
+
+        wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def warming():
+    """Fill caches in the enclosed block without showing anything on the page.
+
+    For background threads, which run without the session's script run
+    context: cached calls made inside do not show their spinner.
+    """
+    _local.warming = True
+    try:
+        yield
+    finally:
+        _local.warming = False
+
+
+def cache_counts():
+    """Hits and misses per cached function since the server started, e.g. {'load_data': {'hit': 9, 'miss': 1}}."""
+    with _counts_lock:
+        return {name: dict(counts) for name, counts in _cache_counts.items()}
+
+
+def start_run():
+    """Start collecting spans for a new rerun."""
+    _local.spans = []
+    _local.depth = 0
+    _local.run_started = time.perf_counter()
+    _local.run_peak = peak_rss_mb()
+
+
+def finish_run(**fields):
+    """Log the rerun as one JSON line and return its summary.
+
+    Call start_run first. The summary holds `fields` (e.g. the page shown),
+    the total ms, peak_mb (the process's peak memory so far), peak_mb_delta
+    for the run, and the list of spans.
+    """
+    peak = peak_rss_mb()
+    summary = {
+        **fields,
+        'ms': round((time.perf_counter() - _local.run_started) * 1000, 2),
+        'peak_mb': None if peak is None else round(peak, 1),
+        'peak_mb_delta': None if peak is None else round(peak - _local.run_peak, 1),
+        'spans': list(_spans()),
+    }
+    logger.info(json.dumps(summary, ensure_ascii=False, default=str))
+    return summary
@@ -0,0 +1,232 @@
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from job_postings import DATA_DIR, month_codes
+
+# Monthly job listings repeat yearly
+SEASON_LENGTH = 12
+
+# Smoothing parameters tried for every series. The whole grid is fitted at once,
+# as one array operation per month, and each series keeps the combination with
+# the smallest one-step-ahead error.
+ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.0, 0.05, 0.1, 0.2)
+GAMMAS = (0.0, 0.1, 0.2, 0.4)
+PHIS = (0.9, 0.98)
+
+# A last month ending more than this many days before its final day was only
+# partly ingested and is left out, so it does not read as a collapse in demand
+PARTIAL_MONTH_DAYS = 3
+
+# Name of the series counting every posting, next to one series per cluster
+TOTAL = 'Industry total'
+
+# Monthly job listings for all ads nationwide (publication_date, job_listings,
+# then columns that are ignored). The postings only cover the industry.
+ALL_JOBS_FILE = os.path.join(DATA_DIR, "forecast_data.csv")
+ALL_JOBS = 'All Job Listings'
+
+
+def monthly_counts(data, by='cluster', total=TOTAL):
+    """Postings per month for the whole frame and per value of `by`.
+
+    `data` is a compact frame from load_job_postings or load_job_postings_store.
+    Returns a frame indexed by month code (months since January 1970, every
+    month in the covered range) with the column `total` followed by one column
+    per value of `by`, zero where nothing was published.
+    """
+    months = month_codes(data['day'])
+    if len(months) == 0:
+        return pd.DataFrame(columns=[total], dtype=np.int64)
+
+    last_day = np.datetime64(int(data['day'].max()), 'D')
+    month_end = (last_day.astype('datetime64[M]') + 1).astype('datetime64[D]') - 1
+    last_month = int(months.max())
+    if (month_end - last_day).astype(int) > PARTIAL_MONTH_DAYS:
+        last_month -= 1
+    all_months = np.arange(months.min(), last_month + 1)
+
+    groups = data[by].astype(str).where(data[by].notna())
+    per_group = pd.crosstab(months, groups).reindex(all_months, fill_value=0)
+    counts = pd.concat([per_group.sum(axis=1).rename(total), per_group], axis=1)
+    counts.index.name = 'month'
+    counts.columns.name = None
+    return counts
+
+
+def read_monthly_listings(path=ALL_JOBS_FILE):
+    """Observed monthly listings of a publication_date, job_listings CSV, indexed by month code."""
+    listings = pd.read_csv(path, usecols=[0, 1], names=['publication_date', 'job_listings'], header=0).dropna()
+    months = month_codes(pd.to_datetime(listings['publication_date']).to_numpy())
+    return pd.Series(listings['job_listings'].to_numpy(), index=months, name=ALL_JOBS)
+
+
+def job_listing_counts(data, all_jobs_path=ALL_JOBS_FILE):
+    """The series the app forecasts: all ads from `all_jobs_path`, then monthly_counts of `data`."""
+    counts = monthly_counts(data)
+    all_jobs = read_monthly_listings(all_jobs_path)
+    counts = counts.reindex(counts.index.union(all_jobs.index))
+    counts.insert(0, ALL_JOBS, all_jobs)
+    return counts
+
+
+def _parameter_grid(season_length):
+    alpha, beta, gamma, phi = (
+        grid.ravel() for grid in np.meshgrid(ALPHAS, BETAS, GAMMAS if season_length > 1 else (0.0,), PHIS)
+    )
+    # The usual admissible region: the season may not absorb more of an error than the level leaves
+    keep = gamma <= 1 - alpha
+    return alpha[keep], beta[keep], gamma[keep], phi[keep]
+
+
+def fit_holt_winters(values, season_length=SEASON_LENGTH):
+    """Fit additive Holt-Winters with a damped trend to every row of `values` at once.
+
+    `values` is a (series, months) array without gaps, on the scale the model
+    should be additive on (the callers use log1p of counts). Every series is
+    smoothed with every parameter combination of the grid in one pass over the
+    months, and keeps the combination with the smallest squared one-step error
+    after the first season. Series shorter than two seasons are fitted without
+    a season.
+
+    Returns a dict of per-series arrays: alpha, beta (share of the error added
+    to the trend), gamma, phi, level, trend, season ((series, season length),
+    indexed by a month's position in `values` modulo the season length),
+    sigma (the one-step error's standard deviation) and the number of months n.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_series, n_months = values.shape
+    if n_months < 3:
+        raise ValueError(f"Need at least 3 months to fit a forecast, got {n_months}")
+    if n_months < 2 * season_length:
+        season_length = 1
+
+    alpha, beta, gamma, phi = _parameter_grid(season_length)
+    trend_gain = alpha * beta
+
+    # Start from the first two seasons: the level and trend of their means, and
+    # the first season's deviations from that trend line
+    if season_length > 1:
+        first = values[:, :season_length].mean(axis=1)
+        trend0 = (values[:, season_length:2 * season_length].mean(axis=1) - first) / season_length
+        offsets = np.arange(season_length) - (season_length - 1) / 2
+        season0 = values[:, :season_length] - (first[:, None] + trend0[:, None] * offsets)
+        level0 = first - trend0 * ((season_length - 1) / 2 + 1)
+    else:
+        trend0 = values[:, 1] - values[:, 0]
+        season0 = np.zeros((n_series, 1))
+        level0 = values[:, 0] - trend0
+
+    # State per series and parameter combination
+    n_params = len(alpha)
+    level = np.repeat(level0[:, None], n_params, axis=1)
+    trend = np.repeat(trend0[:, None], n_params, axis=1)
+    season = np.repeat(season0[:, None, :], n_params, axis=1)
+    sse = np.zeros((n_series, n_params))
+    for t in range(n_months):
+        slot = t % season_length
+        damped = phi * trend
+        error = values[:, t, None] - (level + damped + season[:, :, slot])
+        level = level + damped + alpha * error
+        trend = damped + trend_gain * error
+        season[:, :, slot] += gamma * error
+        if t >= season_length:
+            sse += error * error
+
+    best = sse.argmin(axis=1)
+    rows = np.arange(n_series)
+    fitted_months = n_months - season_length
+    return {
+        'alpha': alpha[best],
+        'beta': trend_gain[best],
+        'gamma': gamma[best],
+        'phi': phi[best],
+        'level': level[rows, best],
+        'trend': trend[rows, best],
+        'season': season[rows, best],
+        'sigma': np.sqrt(sse[rows, best] / fitted_months),
+        'n': n_months,
+    }
+
+
+def predict_holt_winters(fit, horizon, level=0.95):
+    """Forecast `horizon` months past the end of a fit_holt_winters fit.
+
+    Returns (mean, lower, upper) arrays of shape (series, horizon); lower and
+    upper bound the `level` prediction interval of an additive model with
+    normal errors.
+    """
+    steps = np.arange(1, horizon + 1)
+    phi = fit['phi'][:, None]
+    # Sum of phi**1 .. phi**h: how much of the last trend each step still carries
+    damping = np.cumsum(phi ** steps, axis=1)
+    season_length = fit['season'].shape[1]
+    slots = (fit['n'] + steps - 1) % season_length
+    mean = fit['level'][:, None] + damping * fit['trend'][:, None] + fit['season'][:, slots]
+
+    # Variance of the h-step error: sigma^2 * (1 + sum of c_j^2 for j < h)
+    weight = fit['alpha'][:, None] + fit['beta'][:, None] * damping
+    if season_length > 1:
+        weight = weight + fit['gamma'][:, None] * (steps % season_length == 0)
+    carried = np.cumsum(weight ** 2, axis=1)
+    variance = 1 + np.concatenate([np.zeros((len(mean), 1)), carried[:, :-1]], axis=1)
+    spread = NormalDist().inv_cdf(0.5 + level / 2) * fit['sigma'][:, None] * np.sqrt(variance)
+    return mean, mean - spread, mean + spread
+
+
+def _month_end(codes):
+    return (np.asarray(codes) + 1).astype('datetime64[M]').astype('datetime64[D]') - 1
+
+
+def forecast_monthly(counts, horizon=6, level=0.95, season_length=SEASON_LENGTH):
+    """Forecast every column of `counts` (e.g. from monthly_counts) `horizon` months ahead.
+
+    `counts` is indexed by month code and holds one series per column; leading
+    and trailing NaN are trimmed and gaps inside a series are interpolated.
+    The models are fitted on log1p of the counts, so the seasons are relative
+    and the intervals never go below zero. Series covering the same months
+    are fitted together in one batch.
+
+    Returns a tidy frame with the columns series, publication_date (month
+    end), job_listings (observed, NaN in the forecast), forecast, lower and
+    upper. The forecast columns start at the last observed month, with the
+    observed value, so forecast lines join the history.
+    """
+    spans = {}
+    for column in counts.columns:
+        series = counts[column].astype(np.float64)
+        valid = series.dropna()
+        if len(valid):
+            spans.setdefault((valid.index.min(), valid.index.max()), []).append(column)
+
+    frames = []
+    for (first, last), columns in spans.items():
+        months = np.arange(first, last + 1)
+        history = counts.loc[first:last, columns].astype(np.float64).reindex(months).interpolate()
+        observed = history.to_numpy().T
+        fit = fit_holt_winters(np.log1p(observed), season_length)
+        mean, lower, upper = (np.maximum(np.expm1(values), 0) for values in predict_holt_winters(fit, horizon, level))
+
+        future = np.arange(last + 1, last + 1 + horizon)
+        dates = _month_end(np.concatenate([months, future])).astype('datetime64[ns]')
+        padding = np.full((len(columns), len(months) - 1), np.nan)
+        start = observed[:, -1:]
+        for i, column in enumerate(columns):
+            frames.append(pd.DataFrame({
+                'series': column,
+                'publication_date': dates,
+                'job_listings': np.concatenate([observed[i], np.full(horizon, np.nan)]),
+                'forecast': np.concatenate([padding[i], start[i], mean[i]]),
+                'lower': np.concatenate([padding[i], start[i], lower[i]]),
+                'upper': np.concatenate([padding[i], start[i], upper[i]]),
+            }))
+
+    if not frames:
+        return pd.DataFrame(columns=['series', 'publication_date', 'job_listings', 'forecast', 'lower', 'upper'])
+    # Back in the order of the columns
+    order = {column: i for i, column in enumerate(counts.columns)}
+    frames.sort(key=lambda frame: order[frame['series'].iat[0]])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,324 @@
+import calendar
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Directory holding the job postings data (same folder as the app)
+DATA_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Clustered job postings, one row per posting, as written by the clustering scripts
+JOB_POSTINGS_CSV = os.path.join(DATA_DIR, "CCC_datechange.csv")
+
+# Compact Parquet copies of the CSV are kept next to it
+CACHE_DIR = os.path.join(DATA_DIR, ".job_postings_cache")
+
+# Append-only store of ingested postings, one directory per publication month
+# (month=YYYY-MM) holding immutable part files, plus a log of removed ads
+# partitioned the same way by the month the ad was published, and the month of
+# every stored ad ID, so removals can be matched without reading the postings
+STORE_DIR = os.path.join(DATA_DIR, "job_postings_store")
+REMOVALS_DIR = "removals"
+ID_MONTHS_FILE = "id_months.parquet"
+STATE_FILE = "state.json"
+
+
+def to_day_numbers(dates):
+    """Convert datetimes to int32 days since 1970-01-01."""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int32)
+
+
+def month_codes(days):
+    """Months since January 1970 for an array of day numbers."""
+    return np.asarray(days).astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+
+
+def month_label(code):
+    return f"{1970 + code // 12}-{code % 12 + 1:02d}"
+
+
+def quarter_label(code):
+    return f"{1970 + code // 4}Q{code % 4 + 1}"
+
+
+def read_job_postings_csv(path=JOB_POSTINGS_CSV):
+    """Read the postings CSV into the compact layout used by the dashboard.
+
+    Returns a frame with a categorical `cluster` and an int32 `day` (days since
+    1970-01-01). Rows without a valid publication date are dropped.
+    """
+    data = pd.read_csv(path, usecols=['cluster', 'publication_date'], dtype={'cluster': 'category'})
+    dates = pd.to_datetime(data['publication_date'], errors='coerce')
+    valid = dates.notna().to_numpy()
+    return pd.DataFrame({
+        'cluster': data['cluster'][valid].reset_index(drop=True),
+        'day': to_day_numbers(dates[valid]),
+    })
+
+
+def load_job_postings(path=JOB_POSTINGS_CSV):
+    """Load the job postings from a Parquet copy of the CSV, converting it when the CSV changes."""
+    stat = os.stat(path)
+    parquet_path = os.path.join(
+        CACHE_DIR, f"{os.path.splitext(os.path.basename(path))[0]}-{stat.st_mtime_ns}-{stat.st_size}.parquet"
+    )
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path)
+
+    data = read_job_postings_csv(path)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        data.to_parquet(parquet_path + ".tmp", index=False)
+        os.replace(parquet_path + ".tmp", parquet_path)
+    except OSError:
+        # Read-only deployment: serve the converted frame without caching it
+        pass
+    return data
+
+
+def _concat_postings(frames):
+    # Keep `cluster` categorical across part files with different categories
+    clusters = pd.api.types.union_categoricals([frame['cluster'] for frame in frames]).categories
+    for frame in frames:
+        frame['cluster'] = frame['cluster'].cat.set_categories(clusters)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write_part(directory, frame):
+    os.makedirs(directory, exist_ok=True)
+    name = f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+    frame.to_parquet(os.path.join(directory, name + ".tmp"), index=False)
+    os.replace(os.path.join(directory, name + ".tmp"), os.path.join(directory, name))
+
+
+def store_exists(store_dir=STORE_DIR):
+    return os.path.exists(os.path.join(store_dir, STATE_FILE))
+
+
+def store_months(store_dir=STORE_DIR):
+    """Publication months ("YYYY-MM") that have a partition in the store."""
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(name[len("month="):] for name in os.listdir(store_dir) if name.startswith("month="))
+
+
+def _part_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".parquet"))
+
+
+def _partition_files(store_dir, start=None, end=None):
+    return [
+        path
+        for month in store_months(store_dir)
+        if (start is None or month >= start) and (end is None or month <= end)
+        for path in _part_files(os.path.join(store_dir, f"month={month}"))
+    ]
+
+
+def _removal_files(store_dir, start=None, end=None):
+    # Parts logged before removals were partitioned by month apply to every month
+    removals_dir = os.path.join(store_dir, REMOVALS_DIR)
+    return _partition_files(removals_dir, start, end) + _part_files(removals_dir)
+
+
+def store_version(store_dir=STORE_DIR):
+    """Part files of the store; changes whenever postings or removals are appended."""
+    return tuple(_partition_files(store_dir) + _removal_files(store_dir))
+
+
+def _read_part(path, columns=None):
+    # Not cached here: the app caches the loaded frame per store version, and
+    # holding every part in memory as well would double the footprint
+    return pd.read_parquet(path, columns=list(columns) if columns else None)
+
+
+def read_state(store_dir=STORE_DIR):
+    """Ingestion state of the store, e.g. {'high_water_mark': {'field': ..., 'value': ...}}."""
+    with open(os.path.join(store_dir, STATE_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_state(state, store_dir=STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def append_postings(postings, store_dir=STORE_DIR):
+    """Append postings to their month partitions.
+
+    `postings` has the columns id, cluster and day (see read_job_postings_csv).
+    Each month touched gets one new part file; existing files are left alone.
+    Returns the months written to.
+    """
+    postings = postings[['id', 'cluster', 'day']].copy()
+    postings['id'] = postings['id'].astype('string')
+    postings['cluster'] = postings['cluster'].astype('category')
+    postings['day'] = postings['day'].astype(np.int32)
+    months = month_codes(postings['day'])
+    # Recorded first: an ID whose posting is then not written only gets a harmless removal
+    has_id = postings['id'].notna().to_numpy()
+    if has_id.any() or not os.path.exists(os.path.join(store_dir, ID_MONTHS_FILE)):
+        stored = _read_id_months(store_dir)
+        added = pd.Series(months[has_id], index=pd.Index(postings['id'][has_id], name='id'), name='month')
+        _write_id_months(store_dir, pd.concat([stored, added]) if len(stored) else added)
+    written = []
+    for month in np.unique(months):
+        label = month_label(month)
+        _write_part(os.path.join(store_dir, f"month={label}"), postings[months == month].reset_index(drop=True))
+        written.append(label)
+    return written
+
+
+def _read_id_months(store_dir):
+    path = os.path.join(store_dir, ID_MONTHS_FILE)
+    if os.path.exists(path):
+        return pd.read_parquet(path)['month']
+    # Stores written before the file existed: collect it from the postings once
+    ids = [_read_part(part, ('id', 'day')).dropna(subset=['id']) for part in _partition_files(store_dir)]
+    ids = pd.concat(ids) if ids else pd.DataFrame({'id': pd.Series(dtype='string'), 'day': pd.Series(dtype=np.int32)})
+    id_months = pd.Series(month_codes(ids['day']), index=pd.Index(ids['id'], name='id'), name='month')
+    return id_months[~id_months.index.duplicated()]
+
+
+def _write_id_months(store_dir, id_months):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, ID_MONTHS_FILE)
+    id_months = id_months[~id_months.index.duplicated()].astype(np.int32)
+    id_months.index = id_months.index.astype('string')
+    id_months.to_frame().to_parquet(path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def stored_id_months(ids, store_dir=STORE_DIR):
+    """Publication month code of each of `ids` that is stored, as a Series indexed by ID.
+
+    Reads the store's ID file instead of the postings, so it does not read
+    every month partition.
+    """
+    id_months = _read_id_months(store_dir)
+    return id_months[id_months.index.isin(pd.Index(ids).astype('string'))]
+
+
+def append_removals(removals, store_dir=STORE_DIR):
+    """Log removed ads as (id, removed_day) rows; removals are applied when the store is loaded.
+
+    `removals` also has the column month, the month code the ad was published
+    in (see stored_id_months), and each month gets one new part file.
+    """
+    months = np.asarray(removals['month'])
+    for month in np.unique(months):
+        selected = months == month
+        _write_part(os.path.join(store_dir, REMOVALS_DIR, f"month={month_label(month)}"), pd.DataFrame({
+            'id': removals['id'][selected].astype('string').to_numpy(),
+            'removed_day': removals['removed_day'][selected].astype(np.int32).to_numpy(),
+        }))
+
+
+def logged_removals(store_dir=STORE_DIR, start=None, end=None):
+    """Latest logged removal day per ad ID, as a Series indexed by ID.
+
+    Only the removals of ads published from month `start` to `end` ("YYYY-MM",
+    inclusive) are read.
+    """
+    removals = [_read_part(path) for path in _removal_files(store_dir, start, end)]
+    if not removals:
+        return pd.Series(dtype=np.int32, index=pd.Index([], dtype='string', name='id'), name='removed_day')
+    return pd.concat(removals).groupby('id')['removed_day'].max()
+
+
+def stored_ids(store_dir=STORE_DIR, start=None, end=None):
+    """IDs of the postings stored for the months from `start` to `end` (inclusive)."""
+    ids = [_read_part(path, ('id',))['id'] for path in _partition_files(store_dir, start, end)]
+    return set(pd.concat(ids).dropna()) if ids else set()
+
+
+def create_store_from_csv(path=JOB_POSTINGS_CSV, store_dir=STORE_DIR):
+    """Seed the store with the postings in the CSV snapshot.
+
+    The snapshot has no ad IDs, so its rows cannot be matched by later removal
+    updates. The high-water mark is set to the last publication date in it.
+    """
+    data = read_job_postings_csv(path)
+    data.insert(0, 'id', pd.Series(pd.NA, index=data.index, dtype='string'))
+    append_postings(data, store_dir)
+    last_day = np.datetime64(int(data['day'].max()), 'D')
+    write_state({'high_water_mark': {'field': 'publication_date', 'value': f"{last_day}T23:59:59"}}, store_dir)
+
+
+def load_job_postings_store(store_dir=STORE_DIR, start=None, end=None):
+    """Load the postings published from month `start` to `end` ("YYYY-MM", inclusive).
+
+    Only the partitions in the range are read. Returns the columns id, cluster,
+    day and removed_day, the day the ad was removed or -1 while it is still
+    published.
+    """
+    files = _partition_files(store_dir, start, end)
+    if not files:
+        return pd.DataFrame({
+            'id': pd.Series(dtype='string'),
+            'cluster': pd.Series(dtype='category'),
+            'day': pd.Series(dtype=np.int32),
+            'removed_day': pd.Series(dtype=np.int32),
+        })
+    data = _concat_postings([_read_part(path) for path in files])
+
+    # An ad removed more than once keeps its latest removal date
+    removed = logged_removals(store_dir, start, end)
+    removed_day = np.full(len(data), -1, dtype=np.int32)
+    if len(removed):
+        matched = data['id'].map(removed)
+        has_removal = matched.notna().to_numpy()
+        removed_day[has_removal] = matched[has_removal].astype(np.int32)
+    data['removed_day'] = removed_day
+    return data
+
+
+def employment_type_counts(data):
+    """Count job postings per employment type by day, month and quarter.
+
+    `data` is a compact frame from load_job_postings or load_job_postings_store.
+    Returns a dict of tidy tables:
+
+    - 'daily': Publication Date, Employment type, Count
+    - 'monthly': Year, Year-Month, Month, Employment type, Count
+    - 'quarterly': Year-Quarter, Employment type, Count, with a zero row for
+      every quarter in the covered range where a type has no postings
+    """
+    data = data[data['cluster'].notna()]
+
+    # Everything else is aggregated from the daily counts, which are a few
+    # thousand rows regardless of the number of postings
+    daily = data.groupby(['day', 'cluster'], observed=True).size().reset_index(name='Count')
+    daily['cluster'] = daily['cluster'].astype(str)
+    months = month_codes(daily['day'])
+
+    monthly = daily.groupby([months, 'cluster'])['Count'].sum().reset_index()
+    monthly.columns = ['month', 'Employment type', 'Count']
+    monthly.insert(0, 'Year', 1970 + monthly['month'] // 12)
+    monthly.insert(1, 'Year-Month', monthly['month'].map(month_label))
+    monthly.insert(2, 'Month', (monthly['month'] % 12 + 1).map(lambda month: calendar.month_name[month]))
+    monthly = monthly.drop(columns='month')
+
+    cluster_counts = daily.groupby([months // 3, 'cluster'])['Count'].sum()
+
+    # Create a full range of quarters with all possible combinations of quarters and Employment types
+    quarters = cluster_counts.index.get_level_values(0)
+    all_combinations = pd.MultiIndex.from_product(
+        [np.arange(quarters.min(), quarters.max() + 1), cluster_counts.index.get_level_values(1).unique()]
+    )
+    quarterly = cluster_counts.reindex(all_combinations, fill_value=0).reset_index()
+    quarterly.columns = ['Year-Quarter', 'Employment type', 'Count']
+    quarterly['Year-Quarter'] = quarterly['Year-Quarter'].map(quarter_label)
+
+    daily.insert(0, 'Publication Date', daily.pop('day').astype('datetime64[D]').astype('datetime64[ns]'))
+    daily.columns = ['Publication Date', 'Employment type', 'Count']
+
+    return {'daily': daily, 'monthly': monthly, 'quarterly': quarterly}
@@ -0,0 +1,443 @@
+import bisect
+import csv
+import json
+import os
+import re
+import time
+import unicodedata
+from array import array
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+# Bumped whenever the layout of a saved index changes
+INDEX_FORMAT = 3
+
+# Index over the flattened 2023 ads, used by String search CSV and the dashboard
+INDEX_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "job_ads_index")
+INDEX_COLUMNS = ["headline", "description_text", "keywords_extracted_occupation_0"]
+INDEX_FILTER_COLUMNS = ["workplace_address_region", "occupation_field_0_label", "employment_type_0_label"]
+INDEX_DATE_COLUMN = "publication_date"
+
+# Columns the dashboard shows for each ad, and labels for the filters. All names
+# are as "Flatten json file" writes them: list items get their position, so
+# the first employment type's label is employment_type_0_label.
+DISPLAY_COLUMNS = ["publication_date", "headline", "employer_name", "workplace_address_municipality",
+                   "workplace_address_region", "occupation_0_label", "employment_type_0_label", "webpage_url"]
+FILTER_LABELS = {
+    "workplace_address_region": "Region",
+    "occupation_field_0_label": "Occupation field",
+    "employment_type_0_label": "Employment type",
+}
+
+# Day number stored for rows without a valid date
+NO_DAY = np.iinfo(np.int32).min
+
+# Tokens are runs of word characters, the same definition the scan's \b uses
+_TOKEN = re.compile(r'\w+')
+
+
+def fold(text):
+    """Fold a token for indexing and lookup: case-folded, decomposed, without combining marks.
+
+    Folds at least everything the scan's case-insensitive regex treats as
+    equal: 'İstanbul' folds to 'istanbul', where casefold alone gives 'i'
+    plus a combining dot. å, ä and ö fold to a and o as well, which only adds
+    candidates; the regex still decides the matches.
+    """
+    if text.isascii():
+        return text.lower()
+    return ''.join(c for c in unicodedata.normalize('NFKD', text.casefold()) if not unicodedata.combining(c))
+
+
+# Most non-ASCII words repeat across ads, so their folds are worth remembering
+_fold_word = lru_cache(maxsize=1 << 16)(fold)
+
+
+def _tokens(text):
+    """The folded tokens of a text.
+
+    The text is split before folding, so the tokens end where the scan's \\b
+    sees word boundaries even when folding drops or adds characters.
+    """
+    if text.isascii():
+        return _TOKEN.findall(text.lower())
+    return [token.lower() if token.isascii() else _fold_word(token) for token in _TOKEN.findall(text)]
+
+
+def scan_pattern(search_term, search_mode):
+    """The regex String search CSV applies to every row, for the given mode.
+
+    'exact' matches the term anywhere in the text; any other mode requires word
+    boundaries around it. Both ignore case.
+    """
+    if search_mode.lower() == 'exact':
+        return re.compile(re.escape(search_term), flags=re.IGNORECASE)
+    return re.compile(r'\b{}\b'.format(re.escape(search_term)), flags=re.IGNORECASE)
+
+
+def _day_number(value):
+    try:
+        return date.fromisoformat(value[:10]).toordinal() - 719163
+    except ValueError:
+        return NO_DAY
+
+
+class _OffsetLines:
+    """Decoded lines of a binary file that remember the byte offset reached."""
+
+    def __init__(self, f):
+        self.f = f
+        self.position = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.position += len(line)
+        return line.decode('utf-8')
+
+
+class _Vocabulary:
+    """Sorted tokens stored as one newline-separated text, looked up by bisection."""
+
+    def __init__(self, text, starts):
+        self.text = text
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def __getitem__(self, i):
+        return self.text[self.starts[i]:self.starts[i + 1] - 1]
+
+    def find(self, token):
+        i = bisect.bisect_left(self, token)
+        return [i] if i < len(self) and self[i] == token else []
+
+    def with_prefix(self, prefix):
+        return range(bisect.bisect_left(self, prefix), bisect.bisect_left(self, prefix + '\U0010ffff'))
+
+    def matching(self, pattern):
+        # One regex pass over the whole vocabulary text instead of a loop over tokens
+        return np.searchsorted(self.starts, [m.start() for m in pattern.finditer(self.text)], side='right') - 1
+
+
+class JobAdIndex:
+    """Persistent inverted index over text columns of a flattened job ads CSV.
+
+    For every indexed column, each folded token (see fold) maps to the sorted
+    row numbers of the ads containing it, and every row's byte offset in the
+    CSV is kept, so a query reads only the candidate rows from the CSV instead
+    of scanning the whole file. Candidates are checked with the same regex as
+    the scan in String search CSV, so results are identical to it.
+
+    Optional filter columns (e.g. region) are stored as one integer code per
+    row, and a date column as day numbers, so filtering is a vectorized lookup
+    that never reads the CSV.
+
+    The postings, codes and row offsets are memory-mapped when the index is
+    opened, so processes sharing an index share its pages. Terms made only of
+    words found in most ads leave most rows as candidates and approach the
+    cost of a scan.
+    """
+
+    def __init__(self, index_dir):
+        with open(os.path.join(index_dir, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta['format'] != INDEX_FORMAT:
+            raise ValueError(f"{index_dir} has index format {self.meta['format']}, expected {INDEX_FORMAT}")
+        self.index_dir = index_dir
+        # Stored relative to the index, so the CSV and index can be moved together
+        self.source = os.path.abspath(os.path.join(index_dir, self.meta['source']))
+        self.fieldnames = self.meta['fieldnames']
+        self.columns = self.meta['columns']
+        self.filter_columns = self.meta['filter_columns']
+        self.date_column = self.meta['date_column']
+        self.row_offsets = np.load(os.path.join(index_dir, 'rows.npy'), mmap_mode='r')
+        self.days = np.load(os.path.join(index_dir, 'days.npy'), mmap_mode='r') if self.date_column else None
+        self._postings = {}
+        self._filters = {}
+
+    @property
+    def is_current(self):
+        """Whether the CSV is unchanged since the index was built."""
+        stat = os.stat(self.source)
+        return (stat.st_size, stat.st_mtime_ns) == (self.meta['size'], self.meta['mtime_ns'])
+
+    @staticmethod
+    def build(csv_path, index_dir, columns, filter_columns=(), date_column=None):
+        """Index `columns` of `csv_path` into `index_dir` in a single pass over the CSV.
+
+        `filter_columns` are stored as per-row codes for search_page filters and
+        `date_column` (ISO dates) as per-row day numbers for date ranges.
+        """
+        stat = os.stat(csv_path)
+        row_offsets = array('q')
+        vocabularies = [{} for _ in columns]
+        token_ids = [array('i') for _ in columns]
+        token_rows = [array('i') for _ in columns]
+        filter_values = [{} for _ in filter_columns]
+        filter_codes = [array('i') for _ in filter_columns]
+        days = array('i')
+
+        with open(csv_path, 'rb') as f:
+            lines = _OffsetLines(f)
+            reader = csv.reader(lines)
+            fieldnames = next(reader)
+            wanted = list(columns) + list(filter_columns) + ([date_column] if date_column else [])
+            missing = [column for column in wanted if column not in fieldnames]
+            if missing:
+                raise ValueError(f"Columns {missing} not in {csv_path}. Available columns are: {fieldnames}")
+            positions = [fieldnames.index(column) for column in columns]
+            filter_positions = [fieldnames.index(column) for column in filter_columns]
+            date_position = fieldnames.index(date_column) if date_column else None
+
+            row = 0
+            while True:
+                offset = lines.position
+                try:
+                    values = next(reader)
+                except StopIteration:
+                    break
+                if not values:
+                    # csv.DictReader skips blank lines too
+                    continue
+                row_offsets.append(offset)
+                for i, position in enumerate(positions):
+                    if position < len(values):
+                        vocabulary = vocabularies[i]
+                        for token in set(_tokens(values[position])):
+                            token_ids[i].append(vocabulary.setdefault(token, len(vocabulary)))
+                            token_rows[i].append(row)
+                for i, position in enumerate(filter_positions):
+                    # Empty values get code -1 and match no filter value
+                    value = values[position] if position < len(values) else ''
+                    filter_codes[i].append(filter_values[i].setdefault(value, len(filter_values[i])) if value else -1)
+                if date_position is not None:
+                    days.append(_day_number(values[date_position]) if date_position < len(values) else NO_DAY)
+                row += 1
+            # The end of the last row, so every row's byte range is known
+            row_offsets.append(lines.position)
+
+        os.makedirs(index_dir, exist_ok=True)
+        if os.path.exists(os.path.join(index_dir, 'meta.json')):
+            os.remove(os.path.join(index_dir, 'meta.json'))
+        np.save(os.path.join(index_dir, 'rows.npy'), np.frombuffer(row_offsets, dtype=np.int64))
+        for i, vocabulary in enumerate(vocabularies):
+            tokens = sorted(vocabulary)
+            rank = np.empty(len(tokens), dtype=np.int32)
+            rank[[vocabulary[token] for token in tokens]] = np.arange(len(tokens), dtype=np.int32)
+            ids = rank[np.frombuffer(token_ids[i], dtype=np.int32)]
+            # A stable sort keeps each token's rows in file order
+            order = np.argsort(ids, kind='stable')
+            postings = np.frombuffer(token_rows[i], dtype=np.int32)[order]
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(ids, minlength=len(tokens)))])
+
+            text = ''.join(token + '\n' for token in tokens)
+            starts = np.concatenate([[0], np.cumsum([len(token) + 1 for token in tokens], dtype=np.int64)])
+            with open(os.path.join(index_dir, f'col{i}.vocab.txt'), 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            np.save(os.path.join(index_dir, f'col{i}.vocab.npy'), starts.astype(np.int64))
+            np.save(os.path.join(index_dir, f'col{i}.bounds.npy'), bounds.astype(np.int64))
+            np.save(os.path.join(index_dir, f'col{i}.postings.npy'), postings)
+
+        for i, values in enumerate(filter_values):
+            # Codes follow the sorted values, so the values file doubles as the list of choices
+            ordered = sorted(values)
+            rank = np.empty(len(ordered) + 1, dtype=np.int32)
+            rank[[values[value] for value in ordered]] = np.arange(len(ordered), dtype=np.int32)
+            rank[-1] = -1
+            np.save(os.path.join(index_dir, f'filter{i}.codes.npy'), rank[np.frombuffer(filter_codes[i], dtype=np.int32)])
+            with open(os.path.join(index_dir, f'filter{i}.values.json'), 'w', encoding='utf-8') as f:
+                json.dump(ordered, f, ensure_ascii=False)
+        if date_column:
+            np.save(os.path.join(index_dir, 'days.npy'), np.frombuffer(days, dtype=np.int32))
+
+        # The metadata is written last, so an interrupted build is not mistaken for an index
+        with open(os.path.join(index_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': INDEX_FORMAT,
+                'source': os.path.relpath(os.path.abspath(csv_path), os.path.abspath(index_dir)),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'fieldnames': fieldnames,
+                'columns': list(columns),
+                'filter_columns': list(filter_columns),
+                'date_column': date_column,
+                'rows': row,
+            }, f, ensure_ascii=False, indent=2)
+        return JobAdIndex(index_dir)
+
+    @staticmethod
+    def open_or_build(csv_path, index_dir, columns, filter_columns=(), date_column=None):
+        """Open the index in `index_dir`, rebuilding it if it is missing, stale or lacks a column."""
+        try:
+            index = JobAdIndex(index_dir)
+            if (index.source == os.path.abspath(csv_path) and index.is_current
+                    and all(column in index.columns for column in columns)
+                    and all(column in index.filter_columns for column in filter_columns)
+                    and date_column in (None, index.date_column)):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        return JobAdIndex.build(csv_path, index_dir, columns, filter_columns, date_column)
+
+    def _column(self, column):
+        if column not in self._postings:
+            if column not in self.columns:
+                raise ValueError(f"Column {column!r} is not indexed. Indexed columns are: {self.columns}")
+            i = self.columns.index(column)
+            path = os.path.join(self.index_dir, f'col{i}')
+            with open(path + '.vocab.txt', encoding='utf-8', newline='') as f:
+                vocabulary = _Vocabulary(f.read(), np.load(path + '.vocab.npy'))
+            self._postings[column] = (
+                vocabulary,
+                np.load(path + '.bounds.npy', mmap_mode='r'),
+                np.load(path + '.postings.npy', mmap_mode='r'),
+            )
+        return self._postings[column]
+
+    def _rows_with_tokens(self, column, token_ids):
+        vocabulary, bounds, postings = self._column(column)
+        rows = [postings[bounds[i]:bounds[i + 1]] for i in token_ids]
+        if not rows:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(rows))
+
+    def candidates(self, column, search_term, search_mode='exact'):
+        """Rows that may match: those containing every token of the term.
+
+        In 'exact' (substring) mode the term's first and last tokens may be cut
+        off inside a longer word, so they match any token ending or starting
+        with them. Returns None when the term has no word characters, in which
+        case every row is a candidate.
+        """
+        vocabulary = self._column(column)[0]
+        matches = list(_TOKEN.finditer(search_term))
+        if not matches:
+            return None
+
+        rows = None
+        for k, match in enumerate(matches):
+            token = fold(match.group())
+            # A token is whole when the term continues past it with a non-word
+            # character; with word boundaries around the term, every token is
+            open_start = search_mode.lower() == 'exact' and k == 0 and match.start() == 0
+            open_end = search_mode.lower() == 'exact' and k == len(matches) - 1 and match.end() == len(search_term)
+            if open_start and open_end:
+                token_ids = vocabulary.matching(re.compile(r'^[^\n]*' + re.escape(token), flags=re.MULTILINE))
+            elif open_start:
+                token_ids = vocabulary.matching(re.compile(r'^[^\n]*' + re.escape(token) + '$', flags=re.MULTILINE))
+            elif open_end:
+                token_ids = vocabulary.with_prefix(token)
+            else:
+                token_ids = vocabulary.find(token)
+            found = self._rows_with_tokens(column, np.unique(token_ids))
+            rows = found if rows is None else np.intersect1d(rows, found, assume_unique=True)
+            if len(rows) == 0:
+                break
+        return rows
+
+    @property
+    def n_rows(self):
+        return len(self.row_offsets) - 1
+
+    def read_row(self, f, row):
+        """The values of one CSV row, read by its byte range from the open binary file `f`."""
+        start, end = self.row_offsets[row], self.row_offsets[row + 1]
+        f.seek(start)
+        return next(csv.reader(f.read(end - start).decode('utf-8').splitlines(keepends=True)))
+
+    def search(self, search_term, search_column, print_column, search_mode='exact'):
+        """Values of `print_column` for the rows whose `search_column` matches, in file order."""
+        if print_column not in self.fieldnames:
+            raise ValueError(f"Column {print_column!r} not in {self.source}. Available columns are: {self.fieldnames}")
+        pattern = scan_pattern(search_term, search_mode)
+        rows = self.candidates(search_column, search_term, search_mode)
+        if rows is None:
+            rows = range(self.n_rows)
+
+        search_position = self.fieldnames.index(search_column)
+        print_position = self.fieldnames.index(print_column)
+        results = []
+        with open(self.source, 'rb') as f:
+            for row in rows:
+                values = self.read_row(f, row)
+                if search_position < len(values) and pattern.search(values[search_position]):
+                    results.append(values[print_position] if print_position < len(values) else None)
+        return results
+
+    def filter_choices(self, column):
+        """The distinct non-empty values of a filter column, sorted."""
+        return self._filter(column)[0]
+
+    def _filter(self, column):
+        if column not in self._filters:
+            if column not in self.filter_columns:
+                raise ValueError(f"Column {column!r} is not a filter. Filter columns are: {self.filter_columns}")
+            path = os.path.join(self.index_dir, f'filter{self.filter_columns.index(column)}')
+            with open(path + '.values.json', encoding='utf-8') as f:
+                values = json.load(f)
+            self._filters[column] = (values, np.load(path + '.codes.npy', mmap_mode='r'))
+        return self._filters[column]
+
+    def filtered_rows(self, search_term='', search_column=None, search_mode='exact', filters=None, date_range=None):
+        """Candidate rows for a query, narrowed by filters on the stored codes and dates.
+
+        `filters` maps filter columns to the values to keep (an empty selection
+        keeps everything); `date_range` is a (first, last) pair of dates. The
+        rows still have to be checked against the search term.
+        """
+        rows = self.candidates(search_column, search_term, search_mode) if search_term else None
+        if rows is None:
+            rows = np.arange(self.n_rows, dtype=np.int32)
+
+        for column, selected in (filters or {}).items():
+            if selected:
+                values, codes = self._filter(column)
+                wanted = [values.index(value) for value in selected if value in values]
+                rows = rows[np.isin(codes[rows], wanted)]
+        if date_range is not None:
+            if self.days is None:
+                raise ValueError(f"{self.index_dir} has no date column")
+            first, last = (day.toordinal() - 719163 for day in date_range)
+            days = self.days[rows]
+            rows = rows[(days >= first) & (days <= last)]
+        return rows
+
+    def search_page(self, rows, search_term='', search_column=None, search_mode='exact', start=0, page_size=25,
+                    columns=None, time_budget=0.5):
+        """One page of matching ads from `rows` (see filtered_rows), starting at position `start`.
+
+        Candidates are read and checked in file order until the page is full or
+        `time_budget` seconds have passed, so a page costs at most page_size
+        reads plus the misses in between. Returns the rows as dicts of
+        `columns` (all columns by default), the position to continue from
+        (None at the end) and whether the budget ran out before the page filled.
+        """
+        deadline = time.perf_counter() + time_budget
+        pattern = scan_pattern(search_term, search_mode) if search_term else None
+        search_position = self.fieldnames.index(search_column) if pattern else None
+        columns = [column for column in (columns or self.fieldnames) if column in self.fieldnames]
+        positions = [self.fieldnames.index(column) for column in columns]
+
+        results = []
+        position = start
+        with open(self.source, 'rb') as f:
+            while position < len(rows) and len(results) < page_size:
+                if position > start and time.perf_counter() > deadline:
+                    break
+                values = self.read_row(f, rows[position])
+                position += 1
+                if pattern is None or (search_position < len(values) and pattern.search(values[search_position])):
+                    results.append({column: values[i] if i < len(values) else None for column, i in zip(columns, positions)})
+        return {
+            'rows': results,
+            'next_start': position if position < len(rows) else None,
+            'timed_out': len(results) < page_size and position < len(rows),
+        }
@@ -4,8 +4,19 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 import os
-import calendar
 import base64
+import json
+import logging
+import threading
+
+from artikellistan import (OTHER_GROUP, brewery_groups, load_artikellista, load_sales_cube, market_share_changes,
+                          producer_history, sales_cube_version)
+from job_postings import (JOB_POSTINGS_CSV, employment_type_counts, load_job_postings, load_job_postings_store,
+                          store_exists, store_version)
+from job_forecast import ALL_JOBS, ALL_JOBS_FILE, TOTAL, forecast_monthly, job_listing_counts
+from job_search import DISPLAY_COLUMNS, FILTER_LABELS, INDEX_DIR, NO_DAY, JobAdIndex
+from instrumentation import cache_counts, cached, finish_run, span, start_run, timed, warming
+from figure_cache import cached_figure, file_fingerprint
 
 st.set_page_config(
     page_title="TapTrack",
@@ -13,6 +24,9 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Time everything this rerun does; the summary is logged at the end of the script
+start_run()
+
 # CSS to import the font from Google Fonts and apply it
 css_code = """
 <style>
@@ -86,141 +100,378 @@ if 'page' not in st.session_state:
 
 
 # Load data function
-@st.cache_data()
+@cached('load_data', st.cache_data)
 def load_data(year):
-    # Get the directory of the current script
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    
-    # Build the file path using os.path.join
-    file_path = os.path.join(dir_path, f"Artikellistan {year}.xlsx")
-    
-    # Load the data
-    data = pd.read_excel(file_path, header=4)
+    # Served from the Parquet cache; the workbook is only parsed when it has changed
+    data = load_artikellista(year)
     return data
 
 
 # Function to get top sales data for Vega Bryggeri
-@st.cache_data()
+@cached('get_top_vega_bryggeri', st.cache_data)
 def get_top_vega_bryggeri(data, top_n=50):
     filtered_data = data[data['Producentnamn'] == 'Vega Bryggeri']
     top_sales = filtered_data.sort_values(by='Försäljning i liter', ascending=False).head(top_n)
     return top_sales
 
 
-@st.cache_data()
-def load_combined_job_data():
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    file_path = os.path.join(dir_path, "CCC_datechange.csv")
-    data = pd.read_csv(file_path)
-    data['publication_date'] = pd.to_datetime(data['publication_date'], errors='coerce')
-    data['year_month'] = data['publication_date'].dt.to_period('M').astype(str)
-    return data
+def job_data_version():
+    # The store's part files, or the CSV's fingerprint when there is no store, so new
+    # postings in either invalidate the entries keyed on it
+    return store_version() if store_exists() else file_fingerprint([JOB_POSTINGS_CSV])
 
 
-@st.cache_data()
-def load_cci_data():
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    file_path = os.path.join(dir_path, 'CCI_kategorier.xlsx')
-    data = pd.read_excel(file_path)
-    return data
+@cached('load_combined_job_data', st.cache_data)
+def load_combined_job_data(version, start=None, end=None):
+    # `version` is job_data_version(), so ingesting new ads invalidates this entry.
+    # Only the month partitions from `start` to `end` are read.
+    if store_exists():
+        return load_job_postings_store(start=start, end=end)
+    return load_job_postings()
+
+
+@cached('get_employment_type_counts', st.cache_data)
+def get_employment_type_counts(version):
+    return employment_type_counts(load_combined_job_data(version))
+
+
+# Consumer confidence per indicator, one column per month
+CCI_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'CCI_kategorier.xlsx')
+
+
+@cached('load_cci_data', st.cache_data)
+def load_cci_data(version):
+    # `version` is the workbook's fingerprint, so an updated file invalidates this entry.
+    # Returns the index in long format: Indicator, Date, Value and a 'YYYYQn' Quarter.
+    data = pd.read_excel(CCI_FILE)
+
+    # Rename columns for clarity
+    data.columns = ['Indicator'] + pd.to_datetime(data.columns[1:]).tolist()
+
+    # Melt the dataframe to a long format
+    cci_data_long = data.melt(id_vars=['Indicator'], var_name='Date', value_name='Value')
+
+    # Convert the Date column to datetime format
+    cci_data_long['Date'] = pd.to_datetime(cci_data_long['Date'])
+
+    # Remove any leading/trailing spaces in the Indicator names
+    cci_data_long['Indicator'] = cci_data_long['Indicator'].str.strip()
+
+    # Filter out rows with missing 'Value' and 'Indicator'
+    cci_data_long = cci_data_long.dropna(subset=['Value', 'Indicator'])
+
+    # Convert 'Value' to numeric
+    cci_data_long['Value'] = pd.to_numeric(cci_data_long['Value'], errors='coerce')
+
+    # Add a quarter column and convert to string format
+    cci_data_long['Quarter'] = cci_data_long['Date'].dt.to_period('Q').astype(str)
+    return cci_data_long
+
+
+def job_ad_index_version():
+    # The index writes meta.json last, so its mtime changes with every rebuild. The
+    # CSV's size and mtime are part of the version too, so a regenerated CSV is
+    # noticed even when the index is not rebuilt.
+    path = os.path.join(INDEX_DIR, 'meta.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        source = os.path.join(INDEX_DIR, json.load(f)['source'])
+    if not os.path.exists(source):
+        return os.stat(path).st_mtime_ns, None, None
+    csv_stat = os.stat(source)
+    return os.stat(path).st_mtime_ns, csv_stat.st_size, csv_stat.st_mtime_ns
+
+
+@cached('get_job_ad_index', st.cache_resource)
+def get_job_ad_index(version):
+    # One memory-mapped index shared by every session; None when there is no index
+    # or its row offsets no longer match the CSV
+    if version is None:
+        return None
+    try:
+        index = JobAdIndex(INDEX_DIR)
+        return index if index.is_current else None
+    except (OSError, ValueError):
+        # The CSV is gone, or the index was written in an older format
+        return None
+
+
+@cached('get_job_ad_rows', st.cache_data, max_entries=64)
+def get_job_ad_rows(version, search_term, search_column, search_mode, filters, date_range):
+    # Candidate row numbers only; the ads themselves are read one page at a time
+    return get_job_ad_index(version).filtered_rows(search_term, search_column, search_mode, dict(filters), date_range)
+
+
+@cached('get_job_ad_date_bounds', st.cache_data)
+def get_job_ad_date_bounds(version):
+    # None when no ad has a valid publication date
+    days = get_job_ad_index(version).days
+    days = days[days != NO_DAY]
+    if not len(days):
+        return None
+    return [pd.Timestamp(int(day), unit='D').date() for day in (days.min(), days.max())]
+
+
+# Ads shown per page of search results
+JOB_AD_PAGE_SIZE = 25
+
+
+# Years covered by the Artikellistan workbooks
+SALES_YEARS = [2018, 2019, 2020, 2021, 2022, 2023]
+
+
+# One producer's products across all years, filtered while reading. The cache
+# hands out a copy per call, so callers cannot modify the cached frame.
+@cached('get_producer_history', st.cache_data)
+def get_producer_history(producer):
+    return producer_history(producer, SALES_YEARS)
+
+
+@cached('get_sales_cube', st.cache_data)
+def get_sales_cube(version):
+    # `version` changes with the source workbooks, so an updated file invalidates this entry
+    return load_sales_cube(SALES_YEARS)
 
 
 # Function to prepare comparative data
+@timed('get_comparative_data')
 def get_comparative_data():
-    years = [2018, 2019, 2020, 2021, 2022, 2023]
-    frames = []
-    for year in years:
-        data = load_data(year)
-        total_sales = data[data['Producentnamn'] == 'Vega Bryggeri']['Försäljning i liter'].sum()
-        frames.append(pd.DataFrame({'Year': [year], 'Sales in liters': [total_sales]}))
-    return pd.concat(frames)
+    cube = get_sales_cube(sales_cube_version(SALES_YEARS))
+    vega = cube[cube['producer_group'] == 'Vega Bryggeri']
+    total_sales = vega.groupby('Year')['Försäljning i liter'].sum().reindex(SALES_YEARS, fill_value=0)
+    return pd.DataFrame({'Year': total_sales.index, 'Sales in liters': total_sales.values})
 
 
+@timed('get_combined_percentage_change_data')
 def get_combined_percentage_change_data():
-    categories = ["Lageröl", "Säsongsöl", "Specialöl"]
-    years = [2018, 2019, 2020, 2021, 2022, 2023]
-    results = []
-
-    # Dictionary for Similar Gothenburg Breweries with possible alternate names
-    gothenburg_brewery_aliases = {
-        "Dugges Bryggeri": ["Dugges Bryggeri", "Dugges Bryggeri AB"],
-        "O/O Brewing": ["O/O Brewing", "O/O Brewing AB"],
-        "Poppels Bryggeri": ["Poppels Bryggeri", "Poppels Bryggeri AB"],
-        "Spike Brewery": ["Spike Brewery", "Spike Brewery AB"],
-        "Stigbergets Bryggeri": ["Stigbergets Bryggeri", "Stigbergets Gbg Beer Week"],
-        "Beerbliotek": ["Beerbliotek", "Beerbliotek AB"]
-    }
-
-    # Dictionary of Non-Gothenburg Breweries with possible alternate names
-    non_gbg_brewery_aliases = {
-        "Omnipollo": ["Omnipollo", "Omnipollo AB"],
-        "Apex Brewing CO": ["Apex Brewing CO"],
-        "Brekeriet Beer": ["Brekeriet Beer", "Brekeriet Beer AB"],
-        "Oppigårds Bryggeri": ["Oppigårds Bryggeri", "Oppigårds Bryggeri AB"],
-        "Brewski": ["Brewski", "Brewski AB"],
-        "Nils Oscar": ["Nils Oscar", "Nils Oscar AB"],
-        "Hyllie Bryggeri": ["Hyllie Bryggeri", "Hyllie Bryggeri AB"]
-    }
-    
-    # Generate a list of all alternate names for Gothenburg and non-Gothenburg breweries
-    similar_breweries = [alias for aliases in gothenburg_brewery_aliases.values() for alias in aliases]
-    non_gbg_breweries = [alias for aliases in non_gbg_brewery_aliases.values() for alias in aliases]
+    return market_share_changes(get_sales_cube(sales_cube_version(SALES_YEARS)), SALES_YEARS)
+
+
+def get_change_columns():
+    # Chart columns: Vega Bryggeri first, then the total market, then the other registered groups
+    groups = [group for group in brewery_groups() if group != OTHER_GROUP]
+    return [f'{groups[0]} Change %', 'Total Market Change %'] + [f'{group} Change %' for group in groups[1:]]
+
+
+# Months forecast past the last complete month
+FORECAST_HORIZON = 6
+
+
+def forecast_inputs():
+    # Files the forecasts are computed from, for the figure cache
+    return [ALL_JOBS_FILE] + list(store_version() if store_exists() else [JOB_POSTINGS_CSV])
+
+
+@cached('get_job_forecasts', st.cache_data)
+def get_job_forecasts(version, all_jobs_version, horizon=FORECAST_HORIZON):
+    # Forecasts for all ads, the industry and each employment type, fitted in one batch.
+    # `version` and `all_jobs_version` change with the data, so new ads give new forecasts.
+    return forecast_monthly(job_listing_counts(load_combined_job_data(version)), horizon)
+
+
+def _forecast_traces(fig, series, name, color, forecast_color, band_color, visible=True):
+    # History, forecast and confidence band of one series, toggled together from the legend
+    fig.add_trace(go.Scatter(
+        x=series['publication_date'],
+        y=series['job_listings'],
+        mode='lines',
+        name=name,
+        line=dict(color=color, dash='solid'),
+        legendgroup=name,
+        visible=visible,
+    ))
+
+    forecast = series[series['forecast'].notna()]
+    fig.add_trace(go.Scatter(
+        x=forecast['publication_date'],
+        y=forecast['forecast'],
+        mode='lines',
+        name=f'{name} Forecast',
+        line=dict(dash='dash', color=forecast_color),
+        legendgroup=name,
+        visible=visible,
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=forecast['publication_date'].tolist() + forecast['publication_date'].tolist()[::-1],
+        y=forecast['upper'].tolist() + forecast['lower'].tolist()[::-1],
+        fill='toself',
+        fillcolor=band_color,
+        line=dict(color='rgba(0, 0, 0, 0)'),
+        name=f'Confidence Interval {name}',
+        hoverinfo='skip',
+        showlegend=False,
+        legendgroup=name,
+        visible=visible,
+    ))
+
+    # Lower and upper bounds with hover info
+    for bound in ('lower', 'upper'):
+        fig.add_trace(go.Scatter(
+            x=forecast['publication_date'],
+            y=forecast[bound],
+            mode='lines',
+            line=dict(color=band_color),
+            name=f'{bound.capitalize()} Bound {name}',
+            showlegend=False,
+            hoverinfo='y+name',
+            legendgroup=name,
+            visible=visible,
+        ))
 
-    previous_total_excl_vega = None
-    previous_vega_sales = None
-    previous_similar_sales = None
-    previous_non_gbg_sales = None
 
-    for year in years:
-        data = load_data(year)
-        vega_sales_yearly = 0
-        total_sales_yearly = 0
-        similar_sales_yearly = 0
-        non_gbg_sales_yearly = 0
-        
-        for category in categories:
-            category_data = data[data['Varugrupp detalj'] == category]
-            total_sales = category_data['Försäljning i liter'].sum()
-            vega_sales = category_data[category_data['Producentnamn'] == 'Vega Bryggeri']['Försäljning i liter'].sum()
-            similar_sales = category_data[category_data['Producentnamn'].isin(similar_breweries)]['Försäljning i liter'].sum()
-            non_gbg_sales = category_data[category_data['Producentnamn'].isin(non_gbg_breweries)]['Försäljning i liter'].sum()
-
-            vega_sales_yearly += vega_sales
-            total_sales_yearly += total_sales
-            similar_sales_yearly += similar_sales
-            non_gbg_sales_yearly += non_gbg_sales
-
-        other_producers_sales = total_sales_yearly - vega_sales_yearly - similar_sales_yearly - non_gbg_sales_yearly
-
-        if previous_total_excl_vega is not None and previous_vega_sales is not None and previous_similar_sales is not None and previous_non_gbg_sales is not None:
-            total_market_change = ((other_producers_sales - previous_total_excl_vega) / previous_total_excl_vega * 100) if previous_total_excl_vega > 0 else 0
-            vega_change = ((vega_sales_yearly - previous_vega_sales) / previous_vega_sales * 100) if previous_vega_sales > 0 else 0
-            similar_change = ((similar_sales_yearly - previous_similar_sales) / previous_similar_sales * 100) if previous_similar_sales > 0 else 0
-            non_gbg_change = ((non_gbg_sales_yearly - previous_non_gbg_sales) / previous_non_gbg_sales * 100) if previous_non_gbg_sales > 0 else 0
-        else:
-            total_market_change = 0
-            vega_change = 0
-            similar_change = 0
-            non_gbg_change = 0
-
-        results.append({
-            'Year': year,
-            'Vega Bryggeri Change %': vega_change,
-            'Total Market Change %': total_market_change,
-            'Similar Gothenburg Breweries Change %': similar_change,
-            'Non-Gothenburg Breweries Change %': non_gbg_change,
-            'Vega Bryggeri Sales': vega_sales_yearly,
-            'Other Producers Sales': other_producers_sales,
-            'Similar Gothenburg Breweries Sales': similar_sales_yearly,
-            'Non-Gothenburg Breweries Sales': non_gbg_sales_yearly
-        })
-
-        previous_total_excl_vega = other_producers_sales
-        previous_vega_sales = vega_sales_yearly
-        previous_similar_sales = similar_sales_yearly
-        previous_non_gbg_sales = non_gbg_sales_yearly
-
-    return pd.DataFrame(results)
+@timed('chart.forecast')
+def forecast_figure(forecasts):
+    # Job listings and forecasts for all ads and the restaurant industry, with confidence bands.
+    # The employment types start hidden and can be shown from the legend.
+    fig_with_forecast_range_corrected = go.Figure()
+    series = dict(tuple(forecasts.groupby('series', sort=False)))
+
+    _forecast_traces(fig_with_forecast_range_corrected, series.pop(ALL_JOBS), ALL_JOBS,
+                     'red', 'indianred', 'rgba(255, 0, 0, 0.2)')
+    industry = series.pop(TOTAL)
+    _forecast_traces(fig_with_forecast_range_corrected, industry, 'Industry Related Job Listing',
+                     'green', 'lightgreen', 'rgba(0, 255, 0, 0.2)')
+    for (name, cluster), color in zip(series.items(), px.colors.qualitative.Plotly):
+        _forecast_traces(fig_with_forecast_range_corrected, cluster, name, color, color,
+                         'rgba(128, 128, 128, 0.15)', visible='legendonly')
+
+    # The last year of the industry's history and the whole forecast
+    last_observed = industry.loc[industry['job_listings'].notna(), 'publication_date'].max()
+    start_date = last_observed - pd.DateOffset(months=11) + pd.offsets.MonthEnd(0)
+    end_date = industry['publication_date'].max()
+
+    # Update layout with the date range and log scale for y-axis
+    fig_with_forecast_range_corrected.update_layout(
+        title='Forecasted Job Listings',
+        xaxis_title='Publication Date',
+        yaxis_title='Job Listings',
+        legend_title='Job Type',
+        xaxis=dict(
+            tickangle=-45,
+            dtick="M1",  # setting the tick interval to monthly for the specific range
+            tickformat="%Y-%m",
+            range=[start_date, end_date],
+            showgrid=True,  # Show gridlines for x-axis
+            gridwidth=1,
+        ),
+        yaxis=dict(
+            type='log',  # Set the y-axis to a log scale
+            tickformat=",d",
+            title='Job Listings',
+            showgrid=True,  # Show gridlines for y-axis
+            gridwidth=2,
+        ),
+        hovermode='x unified'  # Set hover mode to 'x unified'
+    )
+    return fig_with_forecast_range_corrected
+
+
+def job_forecast_figure():
+    return cached_figure(
+        'forecast',
+        lambda: forecast_figure(get_job_forecasts(job_data_version(), file_fingerprint([ALL_JOBS_FILE]))),
+        paths=forecast_inputs(), version=2,
+    )
+
+
+@timed('chart.cci_trend')
+def cci_trend_figure(cci_data_long):
+    fig_trend = px.line(cci_data_long,
+                        x='Quarter', y='Value',
+                        color='Indicator',
+                        title='Consumer Confidence Index Over Time by Indicator',
+                        color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca'])
+
+    # Add a trace for the 100 baseline to make it interactive; one point per quarter is enough
+    quarters = cci_data_long['Quarter'].unique()
+    fig_trend.add_trace(go.Scatter(
+        x=quarters,
+        y=np.full(len(quarters), 100),
+        mode='lines',
+        line=dict(color="LightSeaGreen", width=2, dash="dash"),
+        name='Baseline (100)'
+    ))
+    return fig_trend
+
+
+@timed('chart.cci_category')
+def cci_category_figure(cci_data_long, year, quarter):
+    # Filter the data for the selected year and quarter ('Q1'..'Q4')
+    dates = cci_data_long['Date']
+    filtered_data = cci_data_long[(dates.dt.year == year) & (dates.dt.quarter == int(quarter[1]))]
+
+    return px.bar(
+        filtered_data,
+        x='Indicator',
+        y='Value',
+        title=f'Consumer Confidence Index by Category for {quarter} {year}',
+        color='Indicator',  # Use different colors for each bar
+        color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b']  # Your specified colors
+    )
+
+
+def lazy_tabs(labels, key):
+    # st.tabs runs the body of every tab on every rerun; a horizontal radio
+    # offers the same choice and lets the page run only the selected tab
+    return st.radio("Tab", labels, horizontal=True, key=key, label_visibility='collapsed')
+
+
+# (page, tab) pairs being warmed right now, shared by all sessions
+_prefetching = set()
+_prefetching_lock = threading.Lock()
+
+# Warm threads run without the session's script run context, so nothing they
+# do reaches the page; Streamlit would log a warning for every cached call
+PREFETCH_THREAD_PREFIX = 'prefetch-'
+
+
+class _PrefetchContextFilter(logging.Filter):
+    def filter(self, record):
+        return not (threading.current_thread().name.startswith(PREFETCH_THREAD_PREFIX)
+                    and 'missing ScriptRunContext' in record.getMessage())
+
+
+_script_run_context_logger = logging.getLogger('streamlit.runtime.scriptrunner.script_run_context')
+if not any(isinstance(f, _PrefetchContextFilter) for f in _script_run_context_logger.filters):
+    _script_run_context_logger.addFilter(_PrefetchContextFilter())
+
+
+def _warm(key, warmer):
+    try:
+        with warming():
+            warmer()
+    except Exception:
+        # The tab shows the error itself if the user opens it
+        pass
+    finally:
+        with _prefetching_lock:
+            _prefetching.discard(key)
+
+
+def prefetch_adjacent(page, labels, selected, warmers):
+    """Warm the caches of the tabs next to `selected` in a background thread.
+
+    `warmers` maps a tab label to a function calling that tab's cached
+    loaders. Each tab is warmed at most once per session and by one thread at
+    a time, so switching to a neighbouring tab usually finds its data cached.
+    The threads are not attached to the session: they only fill caches and
+    never send elements to the page.
+    """
+    index = labels.index(selected)
+    warmed = st.session_state.setdefault('prefetched_tabs', set())
+    for label in labels[max(index - 1, 0):index + 2]:
+        key = (page, label)
+        if label == selected or label not in warmers or key in warmed:
+            continue
+        with _prefetching_lock:
+            if key in _prefetching:
+                continue
+            _prefetching.add(key)
+        warmed.add(key)
+        threading.Thread(target=_warm, args=(key, warmers[label]), name=f'{PREFETCH_THREAD_PREFIX}{page}-{label}',
+                         daemon=True).start()
 
 
 # Sidebar
@@ -232,6 +483,8 @@ if st.sidebar.button("Market Analytics"):
     st.session_state.page = 'Job Postings Data'
 if st.sidebar.button("Systembolaget Sales"):
     st.session_state.page = 'Systembolaget Sales'
+if st.sidebar.button("Job ad search"):
+    st.session_state.page = 'Job ad search'
 
 # Add an empty space that will grow to push the bottom section down
 st.sidebar.markdown("<div id='spacer' style='height: 230px;'></div>", unsafe_allow_html=True)
@@ -240,6 +493,7 @@ st.sidebar.markdown("<div id='spacer' style='height: 230px;'></div>", unsafe_all
 st.sidebar.title("Info")
 if st.sidebar.button("### About us"):
     st.session_state.page = 'About us'
+show_profiling = st.sidebar.checkbox("Show profiling", key='show_profiling')
 
 if st.session_state.page == "About us":
     st.write("### About us")
@@ -273,9 +527,10 @@ st.markdown("""
 # Display content based on the current page
 if st.session_state.page == "Systembolaget Sales":
     st.subheader("Systembolaget Sales")
-    tab1, tab2, tab3 = st.tabs(["Top products", "Volume by year", "Market Share Comparison"])
+    sales_tabs = ["Top products", "Volume by year", "Market Share Comparison"]
+    sales_tab = lazy_tabs(sales_tabs, key='sales_tab')
 
-    with tab1:
+    if sales_tab == "Top products":
         st.markdown("""
                 ### Top Products from Vega Bryggeri by Sales Volume
                 This graph shows the top products from Vega Bryggeri based on their sales volume for the selected year. 
@@ -299,10 +554,11 @@ if st.session_state.page == "Systembolaget Sales":
         })[['Product Name', 'Sales in liters', 'Product Group']]
 
         # Create the bar graph with renamed columns
-        fig = px.bar(top_vega_display, x='Product Name', y='Sales in liters',
-                     title=f"Top {number_of_beers} Products from Vega Bryggeri by Sales Volume",
-                     color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca']
-                     )
+        with span('chart.top_products'):
+            fig = px.bar(top_vega_display, x='Product Name', y='Sales in liters',
+                         title=f"Top {number_of_beers} Products from Vega Bryggeri by Sales Volume",
+                         color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca']
+                         )
         
         st.plotly_chart(fig, use_container_width=True)
 
@@ -316,24 +572,14 @@ if st.session_state.page == "Systembolaget Sales":
         
 
 
-    with tab2:
+    if sales_tab == "Volume by year":
         st.markdown("""
         ### Single Product Sales Over Years
         This line chart compares the sales volume over different years for the selected product.
         """)
 
-        # Load data for all years and add a 'Year' column
-        years = [2018, 2019, 2020, 2021, 2022, 2023]
-        data_frames = []
-        for year in years:
-            df = load_data(year)
-            df['Year'] = year
-            data_frames.append(df)
-
-        combined_data = pd.concat(data_frames)
-
-        # Filter for Vega Bryggeri products
-        vega_data = combined_data[combined_data['Producentnamn'] == 'Vega Bryggeri']
+        # Vega Bryggeri products for all years, with a 'Year' column
+        vega_data = get_producer_history('Vega Bryggeri')
 
         # Get a list of unique products from Vega Bryggeri
         product_list = vega_data['Kvittonamn'].unique()
@@ -354,11 +600,12 @@ if st.session_state.page == "Systembolaget Sales":
         yearly_sales = yearly_sales.rename(columns={'Year': 'Year', 'Försäljning i liter': 'Sales in liters'})
         
         # Create the line chart
-        fig = px.line(yearly_sales, x='Year', y='Sales in liters', title=f'Sales of {selected_product} Over Years',
-                    markers=True, color_discrete_sequence=['#1f77b4'])
+        with span('chart.product_sales'):
+            fig = px.line(yearly_sales, x='Year', y='Sales in liters', title=f'Sales of {selected_product} Over Years',
+                        markers=True, color_discrete_sequence=['#1f77b4'])
         
-        # Ensure the x-axis treats the years as categorical data
-        fig.update_layout(xaxis_type='category')
+            # Ensure the x-axis treats the years as categorical data
+            fig.update_layout(xaxis_type='category')
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -368,13 +615,14 @@ if st.session_state.page == "Systembolaget Sales":
                 """)
 
         comparative_data = get_comparative_data()
-        fig2 = px.line(comparative_data, x='Year', y='Sales in liters', title='Sales Comparison Over Years',
-                       color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca'])
+        with span('chart.sales_comparison'):
+            fig2 = px.line(comparative_data, x='Year', y='Sales in liters', title='Sales Comparison Over Years',
+                           color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca'])
         st.plotly_chart(fig2, use_container_width=True)
 
         
 
-    with tab3:
+    if sales_tab == "Market Share Comparison":
         st.markdown("""
                 ### Annual Market Share Change Percentage
                 This line chart shows the annual percentage change in market share compared to the previous year. It includes Vega Bryggeri, the total market, similar Gothenburg breweries, and non-Gothenburg breweries.
@@ -386,40 +634,47 @@ if st.session_state.page == "Systembolaget Sales":
         percentage_data_filtered = percentage_data[percentage_data['Year'] != 2018]
         
         # Ensure year is displayed correctly and format percentage columns
+        change_columns = get_change_columns()
         percentage_data_filtered['Year'] = percentage_data_filtered['Year'].astype(str)
-        percentage_data_filtered['Vega Bryggeri Change %'] = percentage_data_filtered['Vega Bryggeri Change %'].round(1)
-        percentage_data_filtered['Total Market Change %'] = percentage_data_filtered['Total Market Change %'].round(1)
-        percentage_data_filtered['Similar Gothenburg Breweries Change %'] = percentage_data_filtered['Similar Gothenburg Breweries Change %'].round(1)
-        percentage_data_filtered['Non-Gothenburg Breweries Change %'] = percentage_data_filtered['Non-Gothenburg Breweries Change %'].round(1)
+        percentage_data_filtered[change_columns] = percentage_data_filtered[change_columns].round(1)
         
-        fig3 = px.line(
-            percentage_data_filtered,
-            x='Year',
-            y=['Vega Bryggeri Change %', 'Total Market Change %', 'Similar Gothenburg Breweries Change %', 'Non-Gothenburg Breweries Change %'],
-            title='Annual Market Share Change Percentage compared to previous year',
-            color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca']  # Cerulean Blue, Coral Red, Mustard Yellow, Teal
-        )
-        # Adjust figure size and x-axis range
-        fig3.update_layout(
-            legend=dict(
-                title='Click to hide/show:',  # Adding a title to the legend
-            ),
-            yaxis=dict(
-                zeroline=True,  # Ensure the zero line is visible
-                zerolinewidth=1,  # Make the zero line more visible
-                zerolinecolor='grey',  # Set zero line color
-                gridcolor="grey"
-            ),
-            xaxis=dict(
-                range=[2019, 2023],  # Extend range beyond your actual data for padding
-                tickvals=[2019, 2020, 2021, 2022, 2023],  # Explicitly set tick values to ensure they appear
-            ),
-            width=965  # Adjust width to your preference
-        )
+        with span('chart.market_share'):
+            fig3 = px.line(
+                percentage_data_filtered,
+                x='Year',
+                y=change_columns,
+                title='Annual Market Share Change Percentage compared to previous year',
+                color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca']  # Cerulean Blue, Coral Red, Mustard Yellow, Teal
+            )
+            # Adjust figure size and x-axis range
+            fig3.update_layout(
+                legend=dict(
+                    title='Click to hide/show:',  # Adding a title to the legend
+                ),
+                yaxis=dict(
+                    zeroline=True,  # Ensure the zero line is visible
+                    zerolinewidth=1,  # Make the zero line more visible
+                    zerolinecolor='grey',  # Set zero line color
+                    gridcolor="grey"
+                ),
+                xaxis=dict(
+                    range=[2019, 2023],  # Extend range beyond your actual data for padding
+                    tickvals=[2019, 2020, 2021, 2022, 2023],  # Explicitly set tick values to ensure they appear
+                ),
+                width=965  # Adjust width to your preference
+            )
 
         st.plotly_chart(fig3, use_container_width=False)  # Set use_container_width to False to use manual width
 
-        st.dataframe(percentage_data_filtered[['Year', 'Vega Bryggeri Change %', 'Total Market Change %', 'Similar Gothenburg Breweries Change %', 'Non-Gothenburg Breweries Change %']])
+        st.dataframe(percentage_data_filtered[['Year'] + change_columns])
+
+    # Load the neighbouring tabs' data while the user looks at this one; the
+    # warmers use each tab's default selections
+    prefetch_adjacent("Systembolaget Sales", sales_tabs, sales_tab, {
+        "Top products": lambda: get_top_vega_bryggeri(load_data(SALES_YEARS[-1]), top_n=10),
+        "Volume by year": lambda: (get_producer_history('Vega Bryggeri'), get_comparative_data()),
+        "Market Share Comparison": get_combined_percentage_change_data,
+    })
 
 
     
@@ -439,34 +694,13 @@ if st.session_state.page == "Home":
 if st.session_state.page == "Job Postings Data":
     st.subheader("Market Analytics")
 
-    tab1, tab2, tab3 = st.tabs(["Job Listings Forecast", "Employment type", "Consumer trends"])
-
-    with tab2:
-        data = load_combined_job_data()
-        data['publication_date'] = pd.to_datetime(data['publication_date'], errors='coerce')
-        data['year_quarter'] = data['publication_date'].dt.to_period('Q').astype(str)
-        data['year_month'] = data['publication_date'].dt.to_period('M').astype(str)
-        data['year'] = data['publication_date'].dt.year
+    market_tabs = ["Job Listings Forecast", "Employment type", "Consumer trends"]
+    market_tab = lazy_tabs(market_tabs, key='market_tab')
 
-        data.rename(columns={
-            'cluster': 'Employment type',
-            'publication_date': 'Publication Date',
-            'year_quarter': 'Year-Quarter',
-            'year_month': 'Year-Month',
-            'year': 'Year'
-        }, inplace=True)
-
-        data.dropna(subset=['Employment type', 'Publication Date'], inplace=True)
-
-        # Group by year_quarter and cluster, and count the number of rows for each group
-        cluster_counts = data.groupby(['Year-Quarter', 'Employment type']).size().reset_index(name='Count')
-
-        # Create a full range of Year-Quarters
-        all_quarters = pd.period_range(start=cluster_counts['Year-Quarter'].min(), end=cluster_counts['Year-Quarter'].max(), freq='Q').astype(str)
-        
-        # Create a dataframe with all possible combinations of Year-Quarters and Employment types
-        all_combinations = pd.MultiIndex.from_product([all_quarters, cluster_counts['Employment type'].unique()], names=['Year-Quarter', 'Employment type'])
-        full_cluster_counts = cluster_counts.set_index(['Year-Quarter', 'Employment type']).reindex(all_combinations, fill_value=0).reset_index()
+    if market_tab == "Employment type":
+        # Daily, monthly and quarterly counts per employment type, built once per data load
+        employment_counts = get_employment_type_counts(job_data_version())
+        full_cluster_counts = employment_counts['quarterly']
         
         # Add context text
         st.markdown("""
@@ -477,238 +711,74 @@ if st.session_state.page == "Job Postings Data":
         """)
 
         # Create a line chart for the clusters over time
-        fig = px.line(full_cluster_counts, x='Year-Quarter', y='Count', color='Employment type', 
-                      title='Employment type Over Quarters',
-                      labels={'Year-Quarter': 'Year-Quarter', 'Count': 'Count', 'Employment type': 'Employment type'},
-                      color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca'])
-
-        fig.update_xaxes(
-            tickangle=45,
-            nticks=20,
-            tickformat='%Y-Q%q'
-        )
+        with span('chart.employment_quarters'):
+            fig = px.line(full_cluster_counts, x='Year-Quarter', y='Count', color='Employment type', 
+                          title='Employment type Over Quarters',
+                          labels={'Year-Quarter': 'Year-Quarter', 'Count': 'Count', 'Employment type': 'Employment type'},
+                          color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca'])
+
+            fig.update_xaxes(
+                tickangle=45,
+                nticks=20,
+                tickformat='%Y-Q%q'
+            )
         
-        double_tick_vals = np.arange(0, 25, 1)
-
-        fig.update_layout(
-            legend=dict(
-                title='Click to hide/show:',  # Adding a title to the legend
-            ),
-            yaxis=dict(
-                zerolinewidth=1,  # Make the zero line more visible
-                zerolinecolor='grey',  # Set zero line color
-                gridcolor="rgba(128, 128, 128, 0.5)"  # Set grid line color with 50% opacity
-            ),
-            xaxis=dict(
-                showgrid=True,  # Enable grid lines for the x-axis
-                gridcolor="rgba(128, 128, 128, 0.5)",  # Set the grid line color with 50% opacity
-                gridwidth=1,  # Set the grid line width
-                tickvals=double_tick_vals,  # Set custom tick positions
+            double_tick_vals = np.arange(0, 25, 1)
+
+            fig.update_layout(
+                legend=dict(
+                    title='Click to hide/show:',  # Adding a title to the legend
+                ),
+                yaxis=dict(
+                    zerolinewidth=1,  # Make the zero line more visible
+                    zerolinecolor='grey',  # Set zero line color
+                    gridcolor="rgba(128, 128, 128, 0.5)"  # Set grid line color with 50% opacity
+                ),
+                xaxis=dict(
+                    showgrid=True,  # Enable grid lines for the x-axis
+                    gridcolor="rgba(128, 128, 128, 0.5)",  # Set the grid line color with 50% opacity
+                    gridwidth=1,  # Set the grid line width
+                    tickvals=double_tick_vals,  # Set custom tick positions
+                )
             )
-        )
       
         st.plotly_chart(fig, use_container_width=True)
 
         # Sort the years before displaying in the selectbox
         
         st.markdown("#### Detailed Monthly Data")
-        years = sorted(data['Year'].unique())
+        all_monthly_counts = employment_counts['monthly']
+        years = sorted(all_monthly_counts['Year'].unique())
         selected_year = st.selectbox('Select Year to Filter Monthly Data', years)
-        filtered_data = data[data['Year'] == selected_year]
 
         # Display the month-wise data in a pie chart
-        
-        monthly_counts = filtered_data.groupby(['Year-Month', 'Employment type']).size().reset_index(name='Count')
-
-        # Create a dictionary to map "YYYY-MM" to the month name
-        monthly_counts['Month'] = monthly_counts['Year-Month'].apply(lambda x: calendar.month_name[int(x[-2:])])
+        monthly_counts = all_monthly_counts[all_monthly_counts['Year'] == selected_year]
 
         selected_month = st.selectbox('Select Month to Filter Data', monthly_counts['Month'].unique())
         month_filtered_data = monthly_counts[monthly_counts['Month'] == selected_month]
 
         # Create pie chart
-        pie_fig = go.Figure(data=[go.Pie(labels=month_filtered_data['Employment type'], values=month_filtered_data['Count'], textinfo='label+percent', insidetextorientation='radial')])
-        pie_fig.update_layout(title_text=f'Distribution of Employment Types for {selected_month}', title_y=0.98)
+        with span('chart.employment_month_pie'):
+            pie_fig = go.Figure(data=[go.Pie(labels=month_filtered_data['Employment type'], values=month_filtered_data['Count'], textinfo='label+percent', insidetextorientation='radial')])
+            pie_fig.update_layout(title_text=f'Distribution of Employment Types for {selected_month}', title_y=0.98)
 
         st.plotly_chart(pie_fig, use_container_width=True)
 
 
-    with tab1:
+    if market_tab == "Job Listings Forecast":
         st.write("""
         ### Job Listings and Forecasts Over Time
         This graph presents the job listings and forecasts for all job postings, including a specific focus on the restaurant industry. 
         Shaded areas around the forecast lines indicate the confidence intervals, ***showing the range within which the actual values are expected to fall.***
+        The forecasts are recomputed from the latest job postings; click an employment type in the legend to show its forecast.
         """)
 
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        file_all_jobs = os.path.join(base_dir, 'forecast_data.csv')
-        file_restaurant_jobs = os.path.join(base_dir, 'forecast_data_restaurant.csv')
-
-        # Manually specify the correct columns and ignore extraneous columns
-        correct_columns = ['publication_date', 'job_listings', 'forecast', 'lower', 'upper']
-        df_all_jobs = pd.read_csv(file_all_jobs, usecols=[0, 1, 2, 3, 4], names=correct_columns, header=0)
-        df_restaurant_jobs = pd.read_csv(file_restaurant_jobs, usecols=[0, 1, 2, 3, 4], names=correct_columns, header=0)
-
-        # Convert publication_date to datetime
-        df_all_jobs['publication_date'] = pd.to_datetime(df_all_jobs['publication_date'], errors='coerce')
-        df_restaurant_jobs['publication_date'] = pd.to_datetime(df_restaurant_jobs['publication_date'], errors='coerce')
-
-        # Filter the data within the specified date range
-        start_date = '2023-01-31'
-        end_date = '2024-06-30'
-
-        # Create the figure
-        fig_with_forecast_range_corrected = go.Figure()
-
-        # Add traces for all job listings and Industry Related Job Listing with markers
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_all_jobs['publication_date'],
-            y=df_all_jobs['job_listings'],
-            mode='lines',
-            name='All Job Listings',
-            line=dict(color='red', dash='solid'),
-        ))
-
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_restaurant_jobs['publication_date'],
-            y=df_restaurant_jobs['job_listings'],
-            mode='lines',
-            name='Industry Related Job Listing',
-            line=dict(color='green', dash='solid'),
-        ))
-
-        # Add traces for all job listings forecast and Industry Related Job Listing forecast with different line styles
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_all_jobs['publication_date'],
-            y=df_all_jobs['forecast'],
-            mode='lines',
-            name='All Job Listings Forecast',
-            line=dict(dash='dash', color='indianred'),
-        ))
-
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_restaurant_jobs['publication_date'],
-            y=df_restaurant_jobs['forecast'],
-            mode='lines',
-            name='Industry Related Job Listing Forecast',
-            line=dict(dash='dash', color='lightgreen'),
-        ))
-
-        # Add confidence interval for all job listings
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_all_jobs['publication_date'].tolist() + df_all_jobs['publication_date'].tolist()[::-1],
-            y=df_all_jobs['upper'].tolist() + df_all_jobs['lower'].tolist()[::-1],
-            fill='toself',
-            fillcolor='rgba(255, 0, 0, 0.2)',
-            line=dict(color='rgba(255, 0, 0, 0)'),
-            name='Confidence Interval All Jobs',
-            hoverinfo='skip',
-            showlegend=False,
-        ))
-
-        # Add lower and upper bounds for all job listings with hover info
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_all_jobs['publication_date'],
-            y=df_all_jobs['lower'],
-            mode='lines',
-            line=dict(color='rgba(255, 0, 0, 0.2)'),
-            name='Lower Bound All Jobs',
-            showlegend=False,
-            hoverinfo='y+name',
-        ))
-
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_all_jobs['publication_date'],
-            y=df_all_jobs['upper'],
-            mode='lines',
-            line=dict(color='rgba(255, 0, 0, 0.2)'),
-            name='Upper Bound All Jobs',
-            showlegend=False,
-            hoverinfo='y+name',
-        ))
-
-        # Add confidence interval for industry related job listings
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_restaurant_jobs['publication_date'].tolist() + df_restaurant_jobs['publication_date'].tolist()[::-1],
-            y=df_restaurant_jobs['upper'].tolist() + df_restaurant_jobs['lower'].tolist()[::-1],
-            fill='toself',
-            fillcolor='rgba(0, 255, 0, 0.2)',
-            line=dict(color='rgba(0, 255, 0, 0)'),
-            name='Confidence Interval Industry Jobs',
-            hoverinfo='skip',
-            showlegend=False,
-        ))
-
-        # Add lower and upper bounds for industry related job listings with hover info
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_restaurant_jobs['publication_date'],
-            y=df_restaurant_jobs['lower'],
-            mode='lines',
-            line=dict(color='rgba(0, 255, 0, 0.2)'),
-            name='Lower Bound Industry Jobs',
-            showlegend=False,
-            hoverinfo='y+name',
-        ))
-
-        fig_with_forecast_range_corrected.add_trace(go.Scatter(
-            x=df_restaurant_jobs['publication_date'],
-            y=df_restaurant_jobs['upper'],
-            mode='lines',
-            line=dict(color='rgba(0, 255, 0, 0.2)'),
-            name='Upper Bound Industry Jobs',
-            showlegend=False,
-            hoverinfo='y+name',
-        ))
-
-        # Update layout with the specified date range and log scale for y-axis
-        fig_with_forecast_range_corrected.update_layout(
-            title='Forecasted Job Listings',
-            xaxis_title='Publication Date',
-            yaxis_title='Job Listings',
-            legend_title='Job Type',
-            xaxis=dict(
-                tickangle=-45,
-                dtick="M1",  # setting the tick interval to monthly for the specific range
-                tickformat="%Y-%m",
-                range=[start_date, end_date],
-                showgrid=True,  # Show gridlines for x-axis
-                gridwidth=1,
-            ),
-            yaxis=dict(
-                type='log',  # Set the y-axis to a log scale
-                tickformat=",d",
-                title='Job Listings',
-                showgrid=True,  # Show gridlines for y-axis
-                gridwidth=2,
-            ),
-            hovermode='x unified'  # Set hover mode to 'x unified'
-        )
+        fig_with_forecast_range_corrected = job_forecast_figure()
 
         st.plotly_chart(fig_with_forecast_range_corrected)
 
-    with tab3:
-        cci_data_cleaned = load_cci_data()
-
-        # Rename columns for clarity
-        cci_data_cleaned.columns = ['Indicator'] + pd.to_datetime(cci_data_cleaned.columns[1:]).tolist()
-
-        # Melt the dataframe to a long format
-        cci_data_long = cci_data_cleaned.melt(id_vars=['Indicator'], var_name='Date', value_name='Value')
-
-        # Convert the Date column to datetime format
-        cci_data_long['Date'] = pd.to_datetime(cci_data_long['Date'])
-
-        # Remove any leading/trailing spaces in the Indicator names
-        cci_data_long['Indicator'] = cci_data_long['Indicator'].str.strip()
-
-        # Filter out rows with missing 'Value' and 'Indicator'
-        cci_data_long = cci_data_long.dropna(subset=['Value', 'Indicator'])
-
-        # Convert 'Value' to numeric
-        cci_data_long['Value'] = pd.to_numeric(cci_data_long['Value'], errors='coerce')
-
-        # Add a quarter column and convert to string format
-        cci_data_long['Quarter'] = cci_data_long['Date'].dt.to_period('Q').astype(str)
+    if market_tab == "Consumer trends":
+        cci_data_long = load_cci_data(file_fingerprint([CCI_FILE]))
 
         # Add context text
         st.markdown("""
@@ -718,21 +788,7 @@ if st.session_state.page == "Job Postings Data":
         Below are analyses based on the Consumer trends data. **100** is the baseline value for the index, with values above 100 indicating optimism.
         """)
 
-        # Create the line plot
-        fig_trend = px.line(cci_data_long, 
-                            x='Quarter', y='Value',
-                            color='Indicator', 
-                            title='Consumer Confidence Index Over Time by Indicator',
-                            color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b', '#30e3ca'])
-
-        # Add a trace for the 100 baseline to make it interactive
-        fig_trend.add_trace(go.Scatter(
-            x=cci_data_long['Quarter'],
-            y=[100] * len(cci_data_long),
-            mode='lines',
-            line=dict(color="LightSeaGreen", width=2, dash="dash"),
-            name='Baseline (100)'
-        ))
+        fig_trend = cached_figure('cci_trend', lambda: cci_trend_figure(cci_data_long), paths=[CCI_FILE])
 
         st.plotly_chart(fig_trend)
 
@@ -743,41 +799,112 @@ if st.session_state.page == "Job Postings Data":
         This bar chart provides a snapshot of consumer confidence in various sectors for the selected period.
         """)
 
-        # Extract unique years and quarters
-        cci_data_long['Year'] = cci_data_long['Date'].dt.year
-        cci_data_long['Quarter'] = cci_data_long['Date'].dt.quarter
-
-        unique_years = cci_data_long['Year'].unique()
+        unique_years = cci_data_long['Date'].dt.year.unique()
         unique_quarters = ['Q1', 'Q2', 'Q3', 'Q4']
 
         # Dropdown menus for year and quarter
         selected_year = st.selectbox('Select Year for Category Comparison', sorted(unique_years))
         selected_quarter = st.selectbox('Select Quarter for Category Comparison', unique_quarters)
 
-        # Map quarter names back to integers for filtering
-        quarter_mapping = {'Q1': 1, 'Q2': 2, 'Q3': 3, 'Q4': 4}
-        selected_quarter_int = quarter_mapping[selected_quarter]
-
-        # Filter the data for the selected year and quarter
-        filtered_data = cci_data_long[(cci_data_long['Year'] == selected_year) & 
-                                    (cci_data_long['Quarter'] == selected_quarter_int)]
-
-        # Create the bar chart
-        fig_category_comparison = px.bar(
-            filtered_data, 
-            x='Indicator', 
-            y='Value', 
-            title=f'Consumer Confidence Index by Category for {selected_quarter} {selected_year}',
-            color='Indicator',  # Use different colors for each bar
-            color_discrete_sequence=['#1f77b4', '#ff6b6b', '#ffc13b']  # Your specified colors
+        fig_category_comparison = cached_figure(
+            'cci_category', lambda: cci_category_figure(cci_data_long, selected_year, selected_quarter),
+            paths=[CCI_FILE], params=[int(selected_year), selected_quarter],
         )
         st.plotly_chart(fig_category_comparison)
+
+    prefetch_adjacent("Job Postings Data", market_tabs, market_tab, {
+        "Employment type": lambda: get_employment_type_counts(job_data_version()),
+        "Job Listings Forecast": job_forecast_figure,
+        "Consumer trends": lambda: load_cci_data(file_fingerprint([CCI_FILE])),
+    })
     
 
+if st.session_state.page == "Job ad search":
+    st.subheader("Job ad search")
+    index_version = job_ad_index_version()
+    job_ad_index = get_job_ad_index(index_version)
+
+    if index_version is None:
+        st.info("No job ad index found. Build it by running 'String search CSV' in the dataset manipulation folder.")
+    elif job_ad_index is None:
+        st.info("The job ad index is out of date with its CSV or this version of the app. Rebuild it by running "
+                "'String search CSV' in the dataset manipulation folder.")
+    else:
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            search_term = st.text_input("Search", key='job_search_term')
+        with col2:
+            search_column = st.selectbox("In column", job_ad_index.columns, key='job_search_column')
+        with col3:
+            search_mode = st.selectbox("Match", ['exact', 'word'], key='job_search_mode',
+                                       format_func=lambda mode: {'exact': 'Anywhere', 'word': 'Whole words'}[mode])
+
+        filter_cols = st.columns(len(job_ad_index.filter_columns) or 1)
+        filters = []
+        for filter_col, column in zip(filter_cols, job_ad_index.filter_columns):
+            with filter_col:
+                selected = st.multiselect(FILTER_LABELS.get(column, column),
+                                          job_ad_index.filter_choices(column), key=f'job_search_{column}')
+            filters.append((column, tuple(selected)))
+
+        date_range = None
+        date_bounds = get_job_ad_date_bounds(index_version) if job_ad_index.date_column else None
+        if date_bounds is not None:
+            first_day, last_day = date_bounds
+            selected_dates = st.date_input("Publication date", (first_day, last_day), min_value=first_day,
+                                           max_value=last_day, key='job_search_dates')
+            if len(selected_dates) == 2 and tuple(selected_dates) != (first_day, last_day):
+                date_range = tuple(selected_dates)
+
+        rows = get_job_ad_rows(index_version, search_term.strip(), search_column, search_mode, tuple(filters), date_range)
+
+        # Start positions of the pages seen so far, reset whenever the query changes
+        query = (index_version, search_term.strip(), search_column, search_mode, tuple(filters), date_range)
+        if st.session_state.get('job_search_query') != query:
+            st.session_state.job_search_query = query
+            st.session_state.job_search_pages = [0]
+        pages = st.session_state.job_search_pages
+
+        with span('job_ad_search_page') as timing:
+            page = job_ad_index.search_page(rows, search_term.strip(), search_column, search_mode, start=pages[-1],
+                                            page_size=JOB_AD_PAGE_SIZE, columns=DISPLAY_COLUMNS)
+
+        st.caption(f"{len(rows):,} candidate ads · page {len(pages)} · {timing['ms']:.0f} ms"
+                   + (" · time limit reached, showing the matches found so far" if page['timed_out'] else ""))
+        if page['rows']:
+            st.dataframe(pd.DataFrame(page['rows']), hide_index=True, use_container_width=True)
+        else:
+            st.write("No matching ads on this page.")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Previous page", disabled=len(pages) == 1):
+                pages.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next page", disabled=page['next_start'] is None):
+                pages.append(page['next_start'])
+                st.rerun()
+
 
 # Footer
 st.markdown("---")
 st.markdown("© 2024 MicroBrew Metrics. All rights reserved.")
+
+# Where this rerun's time went; always logged, shown in the sidebar on request
+run_summary = finish_run(page=st.session_state.page)
+if show_profiling:
+    with st.sidebar:
+        st.markdown("#### Profiling")
+        peak = f" · peak memory {run_summary['peak_mb']:.0f} MB (+{run_summary['peak_mb_delta']:.0f})" \
+            if run_summary['peak_mb'] is not None else ""
+        st.caption(f"This rerun: {run_summary['ms']:.0f} ms{peak}")
+        spans = pd.DataFrame(run_summary['spans'], columns=['name', 'depth', 'ms', 'cache', 'peak_mb_delta'])
+        spans['name'] = ['\u00a0\u00a0' * depth + name for name, depth in zip(spans['name'], spans['depth'])]
+        st.dataframe(spans.drop(columns='depth'), hide_index=True, use_container_width=True)
+        st.caption("Cache hits and misses since the server started")
+        st.dataframe(pd.DataFrame.from_dict(cache_counts(), orient='index', columns=['hit', 'miss']),
+                     use_container_width=True)
 if __name__ == "__main__":
     def main():
         pass  # Main function definition is empty as Streamlit runs script top-down
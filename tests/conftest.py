@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+APP_DIR = os.path.join(REPO_DIR, 'streamlit')
+SCRIPTS_DIR = os.path.join(REPO_DIR, 'dataset manipulation')
+BENCHMARK_DIR = os.path.join(REPO_DIR, 'benchmarks')
+
+# The app and the scripts import their modules from their own folders
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+
+@pytest.fixture(scope='session')
+def flattened_ads(tmp_path_factory):
+    # The CSV "Flatten json file" writes, from ads shaped like the JobTech files
+    import generators
+    from jsonl_flatten import flatten_jsonl
+
+    directory = tmp_path_factory.mktemp('ads')
+    generators.write_job_ads(directory / '2023.jsonl', 300, seed=1)
+    flatten_jsonl(str(directory / '2023.jsonl'), str(directory / '2023.csv'))
+    return directory / '2023.csv'
@@ -0,0 +1,109 @@
+import os
+import time
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from conftest import APP_DIR
+
+SLOW_SECONDS = 1
+
+MARKET_TABS = ["Job Listings Forecast", "Employment type", "Consumer trends"]
+
+
+@pytest.fixture
+def cold_caches(tmp_path, monkeypatch):
+    # Nothing cached in Streamlit, in memory or on disk, so every tab misses
+    import figure_cache
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    monkeypatch.setattr(figure_cache, 'CACHE_DIR', str(tmp_path / 'figures'))
+    figure_cache._figures.clear()
+    yield
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    figure_cache._figures.clear()
+
+
+@pytest.fixture
+def slow_loaders(monkeypatch):
+    # Slower than the cache spinner's delay, so a prefetch that drew on the page would show it
+    import job_postings
+
+    def slow(fn):
+        def wrapper(*args, **kwargs):
+            time.sleep(SLOW_SECONDS)
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(job_postings, 'employment_type_counts', slow(job_postings.employment_type_counts))
+    monkeypatch.setattr(job_postings, 'load_job_postings', slow(job_postings.load_job_postings))
+
+
+def test_switching_market_tabs_on_cold_caches(cold_caches, slow_loaders):
+    # The first run prefetches the neighbouring tabs; the next runs open them
+    # while the prefetch is still running and after it has finished
+    at = AppTest.from_file(os.path.join(APP_DIR, 'streamlit_app.py'), default_timeout=600)
+    at.session_state.page = 'Job Postings Data'
+    at.run()
+    assert not at.exception
+    assert len(at.get('plotly_chart')) == 1
+
+    for label in MARKET_TABS[1:] + MARKET_TABS[:1]:
+        at.radio(key='market_tab').set_value(label)
+        at.run()
+        assert not at.exception, label
+        assert at.get('plotly_chart'), label
+        time.sleep(SLOW_SECONDS)
+
+
+def test_job_ad_search_asks_for_rebuild_when_csv_changes(cold_caches, flattened_ads, tmp_path, monkeypatch):
+    import job_search
+
+    csv_path = tmp_path / '2023.csv'
+    lines = flattened_ads.read_bytes().splitlines(keepends=True)
+    csv_path.write_bytes(b''.join(lines))
+    index_dir = tmp_path / 'index'
+    job_search.JobAdIndex.build(str(csv_path), str(index_dir), job_search.INDEX_COLUMNS,
+                                job_search.INDEX_FILTER_COLUMNS, job_search.INDEX_DATE_COLUMN)
+    monkeypatch.setattr(job_search, 'INDEX_DIR', str(index_dir))
+
+    at = AppTest.from_file(os.path.join(APP_DIR, 'streamlit_app.py'), default_timeout=600)
+    at.session_state.page = 'Job ad search'
+    at.run()
+    assert not at.exception
+    assert len(at.dataframe) == 1
+
+    # Regenerated without its first ad: every stored byte offset is now wrong
+    csv_path.write_bytes(lines[0] + b''.join(lines[2:]))
+    at.run()
+    assert not at.exception
+    assert not at.dataframe
+    assert any('Rebuild it' in info.value for info in at.info)
+
+
+def test_job_ad_search_without_publication_dates(cold_caches, flattened_ads, tmp_path, monkeypatch):
+    import csv
+
+    import job_search
+
+    with open(flattened_ads, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    csv_path = tmp_path / '2023.csv'
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows({**row, job_search.INDEX_DATE_COLUMN: ''} for row in rows)
+    index_dir = tmp_path / 'index'
+    job_search.JobAdIndex.build(str(csv_path), str(index_dir), job_search.INDEX_COLUMNS,
+                                job_search.INDEX_FILTER_COLUMNS, job_search.INDEX_DATE_COLUMN)
+    monkeypatch.setattr(job_search, 'INDEX_DIR', str(index_dir))
+
+    at = AppTest.from_file(os.path.join(APP_DIR, 'streamlit_app.py'), default_timeout=600)
+    at.session_state.page = 'Job ad search'
+    at.run()
+    assert not at.exception
+    assert not at.date_input
+    assert len(at.dataframe) == 1
@@ -0,0 +1,73 @@
+import csv
+
+import pytest
+
+from job_search import (DISPLAY_COLUMNS, FILTER_LABELS, INDEX_COLUMNS, INDEX_DATE_COLUMN, INDEX_FILTER_COLUMNS, JobAdIndex,
+                        scan_pattern)
+
+
+def header(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f))
+
+
+def test_index_columns_are_flattened_columns(flattened_ads):
+    assert set(INDEX_COLUMNS) <= set(header(flattened_ads))
+
+
+def test_dashboard_columns_are_flattened_columns(flattened_ads):
+    columns = set(header(flattened_ads))
+    assert set(INDEX_FILTER_COLUMNS) <= columns
+    assert set(DISPLAY_COLUMNS) <= columns
+    assert INDEX_DATE_COLUMN in columns
+    assert set(FILTER_LABELS) == set(INDEX_FILTER_COLUMNS)
+
+
+def test_search_flattened_ads(flattened_ads, tmp_path):
+    index = JobAdIndex.build(str(flattened_ads), str(tmp_path / 'index'), INDEX_COLUMNS)
+    with open(flattened_ads, newline='', encoding='utf-8') as f:
+        ads = list(csv.DictReader(f))
+    occupation = ads[0]['keywords_extracted_occupation_0']
+    expected = [ad['id'] for ad in ads if ad['keywords_extracted_occupation_0'].casefold() == occupation.casefold()]
+
+    found = index.search(occupation, 'keywords_extracted_occupation_0', 'id', 'word')
+    assert set(expected) <= set(found)
+
+
+def test_filter_and_page_flattened_ads(flattened_ads, tmp_path):
+    # The index the dashboard opens, built from the flattened CSV
+    index = JobAdIndex.build(str(flattened_ads), str(tmp_path / 'index'), INDEX_COLUMNS, INDEX_FILTER_COLUMNS,
+                             INDEX_DATE_COLUMN)
+    with open(flattened_ads, newline='', encoding='utf-8') as f:
+        ads = list(csv.DictReader(f))
+    employment_type = index.filter_choices('employment_type_0_label')[0]
+    expected = [ad for ad in ads if ad['employment_type_0_label'] == employment_type]
+
+    rows = index.filtered_rows(filters={'employment_type_0_label': [employment_type]})
+    page = index.search_page(rows, page_size=len(ads), columns=DISPLAY_COLUMNS, time_budget=60)
+    assert len(page['rows']) == len(expected)
+    assert page['rows'][0] == {column: expected[0][column] for column in DISPLAY_COLUMNS}
+
+
+def scan(path, search_term, search_column, print_column, search_mode):
+    # The full scan String search CSV did before the index
+    pattern = scan_pattern(search_term, search_mode)
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row[print_column] for row in csv.DictReader(f) if pattern.search(row[search_column])]
+
+
+@pytest.mark.parametrize('search_mode', ['exact', 'word'])
+@pytest.mark.parametrize('search_term', ['istanbul', 'İSTANBUL', 'stanbul', 'οδος', 'ΟΔΟΣ', 'stad', 'åre', 'ARE',
+                                         'kock', 'Kock i', 'café', 's', 'straße', 'STRASSE'])
+def test_index_matches_the_scan(tmp_path, search_term, search_mode):
+    headlines = ['Kock i İstanbul', 'Servitör, ΟΔΟΣ 5', 'ſtad och kök', 'Bartender i Åre', 'Kock', 'Diskare',
+                 'Cafés på Straße 1', 'café', 'are you hiring?']
+    path = tmp_path / 'ads.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'headline'])
+        writer.writerows(enumerate(headlines))
+    index = JobAdIndex.build(str(path), str(tmp_path / 'index'), ['headline'])
+
+    assert index.search(search_term, 'headline', 'id', search_mode) == scan(path, search_term, 'headline', 'id',
+                                                                             search_mode)
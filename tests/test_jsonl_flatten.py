@@ -0,0 +1,48 @@
+import csv
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from jsonl_flatten import flatten_jsonl
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def test_parquet_types_are_unified_across_batches(tmp_path):
+    # Batches of two rows: the types of a column differ between batches, and
+    # one column only appears in the last batch
+    records = [
+        {'id': 1, 'number': 1, 'mixed': 1, 'nested': {'value': None}},
+        {'id': 2, 'number': 2, 'mixed': 2, 'nested': {'value': None}},
+        {'id': 3, 'number': 2.5, 'mixed': True, 'nested': {'value': 'x'}},
+        {'id': 4, 'number': None, 'mixed': 'text', 'nested': {'value': None}, 'late': [7]},
+    ]
+    write_jsonl(tmp_path / 'ads.jsonl', records)
+    stats = flatten_jsonl(str(tmp_path / 'ads.jsonl'), str(tmp_path / 'ads.parquet'), batch_size=2)
+
+    table = pq.read_table(tmp_path / 'ads.parquet')
+    assert stats['rows'] == 4
+    assert table.schema == pa.schema([('id', pa.int64()), ('number', pa.float64()), ('mixed', pa.string()),
+                                      ('nested_value', pa.string()), ('late_0', pa.int64())])
+    assert table.to_pydict() == {
+        'id': [1, 2, 3, 4],
+        'number': [1.0, 2.0, 2.5, None],
+        'mixed': ['1', '2', 'True', 'text'],
+        'nested_value': [None, None, 'x', None],
+        'late_0': [None, None, None, 7],
+    }
+
+
+def test_csv_has_every_column(tmp_path):
+    write_jsonl(tmp_path / 'ads.jsonl', [{'id': 1, 'employment_type': [{'label': 'Heltid'}]},
+                                         {'id': 2, 'headline': 'Kock'}])
+    flatten_jsonl(str(tmp_path / 'ads.jsonl'), str(tmp_path / 'ads.csv'), batch_size=1)
+
+    with open(tmp_path / 'ads.csv', newline='', encoding='utf-8') as f:
+        assert list(csv.reader(f)) == [['id', 'employment_type_0_label', 'headline'], ['1', 'Heltid', ''],
+                                       ['2', '', 'Kock']]
@@ -0,0 +1,127 @@
+import json
+import random
+
+import pandas as pd
+import pytest
+
+from jsonl_ingest import FieldProjection, parse_field_path, read_jsonl
+
+
+# The per-value helpers the scripts applied row by row before read_jsonl took field paths
+
+def extract_label_from_list(data):
+    if isinstance(data, list) and len(data) > 0:
+        return data[0].get('label', None)
+    return None
+
+
+def extract_label_from_dict(data):
+    if isinstance(data, dict):
+        return data.get('label', None)
+    return None
+
+
+def extract_conditions_from_dict(data):
+    if isinstance(data, dict):
+        return data.get('conditions', None)
+    return None
+
+
+def extract_label_from_list_or_dict(data):
+    if isinstance(data, list) and data:
+        return data[0]['label']
+    if isinstance(data, dict) and 'label' in data:
+        return data['label']
+    return None
+
+
+# Output column: (source column, helper, field path)
+FIELDS = {
+    'description_conditions': ('description', extract_conditions_from_dict, 'description.conditions'),
+    'working_hours_type_label': ('working_hours_type', extract_label_from_dict, 'working_hours_type.label'),
+    'duration_label': ('duration', extract_label_from_dict, 'duration.label'),
+    'employment_type_label': ('employment_type', extract_label_from_list, 'employment_type[0].label'),
+    'occupation_label': ('occupation', extract_label_from_list, 'occupation[0].label'),
+    'occupation_field_label': ('occupation_field', extract_label_from_list_or_dict,
+                               ('occupation_field[0].label', 'occupation_field.label')),
+    'salary_type_label': ('salary_type', extract_label_from_list_or_dict,
+                          ('salary_type[0].label', 'salary_type.label')),
+}
+
+
+def concept(label):
+    return {'concept_id': 'x', 'label': label, 'legacy_ams_taxonomy_id': '1'}
+
+
+def make_ad(rng, i):
+    # Missing and null fields, empty lists and concepts without a label all occur in the real data
+    def maybe(value):
+        roll = rng.random()
+        return value if roll < 0.8 else (None if roll < 0.9 else ...)
+
+    ad = {
+        'id': str(i),
+        'description': maybe(rng.choice([{'text': 'Vi söker ...', 'conditions': rng.choice(['Heltid', None])},
+                                         {'text': 'Vi söker ...'}, 'Heltid'])),
+        'working_hours_type': maybe(rng.choice([concept('Heltid'), {'concept_id': None}, [concept('Deltid')]])),
+        'duration': maybe(rng.choice([concept('Tills vidare'), {}, 'Tills vidare'])),
+        'employment_type': maybe(rng.choice([[concept('Vanlig anställning')], [], [{'concept_id': 'y'}],
+                                             concept('Sommarjobb')])),
+        'occupation': maybe(rng.choice([[concept('Kock'), concept('Servitör')], [], {}])),
+        # Single concepts in some years, lists of concepts in others
+        'occupation_field': maybe(rng.choice([concept('Hotell, restaurang, storhushåll'),
+                                              [concept('Hotell, restaurang, storhushåll')], [], {}])),
+        'salary_type': maybe(rng.choice([concept('Fast månads- vecko- eller timlön'), [concept('Rörlig')], []])),
+    }
+    return {key: value for key, value in ad.items() if value is not ...}
+
+
+@pytest.fixture(scope='module')
+def ads():
+    rng = random.Random(42)
+    return [make_ad(rng, i) for i in range(2000)]
+
+
+def reference_frame(ads):
+    sources = pd.DataFrame.from_records(ads, columns=['id'] + sorted({source for source, _, _ in FIELDS.values()}))
+    return pd.DataFrame({name: sources[source].apply(extract) for name, (source, extract, _) in FIELDS.items()})
+
+
+def test_field_paths_match_the_row_wise_helpers(ads):
+    projection = FieldProjection({name: paths for name, (_, _, paths) in FIELDS.items()})
+    projected = pd.DataFrame.from_records([projection(ad) for ad in ads], columns=list(FIELDS))
+    pd.testing.assert_frame_equal(reference_frame(ads), projected)
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_read_jsonl_fields_match_the_row_wise_helpers(ads, tmp_path, processes):
+    path = tmp_path / 'ads.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for ad in ads:
+            f.write(json.dumps(ad, ensure_ascii=False) + '\n')
+
+    result = read_jsonl(str(path), columns=['id'], fields={name: paths for name, (_, _, paths) in FIELDS.items()},
+                        processes=processes)
+    expected = reference_frame(ads)
+    expected.insert(0, 'id', [ad['id'] for ad in ads])
+    pd.testing.assert_frame_equal(expected, result)
+
+
+def test_paths_of_every_shape():
+    record = {'a': {'b': [{'c': 1}, {'c': 2}]}, 'd': [[5, 6]], 'e': 'x'}
+    projection = FieldProjection({
+        'deep': 'a.b[1].c',
+        'last': 'a.b[-1].c',
+        'out_of_range': 'a.b[2].c',
+        'nested_list': 'd[0][1]',
+        'wrong_type': 'e.f',
+        'fallback': ('missing', 'e'),
+    })
+    assert projection(record) == {'deep': 2, 'last': 2, 'out_of_range': None, 'nested_list': 6,
+                                  'wrong_type': None, 'fallback': 'x'}
+
+
+@pytest.mark.parametrize('path', ['', '.a', 'a.', 'a..b', '[0]', 'a[x]', 'a[0]b', 'a.[0]'])
+def test_invalid_paths(path):
+    with pytest.raises(ValueError):
+        parse_field_path(path)
@@ -0,0 +1,55 @@
+import random
+import sys
+import time
+
+import numpy as np
+
+from driving_licence_model import load_model
+
+# Model saved by "supervised learning train and test model"
+model_path = sys.argv[1] if len(sys.argv) > 1 else 'driving_licence_model.joblib'
+
+# Number of synthetic ads scored in each mode
+n_ads = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+batch_size = 1024
+
+model = load_model(model_path)
+
+# Synthetic ads with headlines drawn from the model's vocabulary, plus unknown words
+random.seed(42)
+vocabulary = list(model.embedder.vocabulary[:5000]) + ['okäntord']
+ads = [
+    {
+        'headline': ' '.join(random.choices(vocabulary, k=random.randint(1, 6))),
+        **{column: random.randint(0, 1) for column in model.feature_columns},
+    }
+    for _ in range(n_ads)
+]
+
+
+def report(mode, latencies, rows):
+    latencies = np.array(latencies) * 1000
+    print(f"{mode}: p50 {np.percentile(latencies, 50):.3f} ms, p99 {np.percentile(latencies, 99):.3f} ms, "
+          f"{rows / (latencies.sum() / 1000):.0f} rows/s")
+
+
+# Single-ad calls, one at a time
+latencies = []
+single = []
+for ad in ads:
+    start = time.perf_counter()
+    single.append(model.predict_one(ad))
+    latencies.append(time.perf_counter() - start)
+report("predict_one", latencies, n_ads)
+
+# Micro-batches, one latency per batch
+latencies = []
+batched = []
+for i in range(0, n_ads, batch_size):
+    start = time.perf_counter()
+    batched.extend(model.predict(ads[i:i + batch_size]))
+    latencies.append(time.perf_counter() - start)
+report(f"predict, batches of {batch_size}", latencies, n_ads)
+
+agreement = np.mean(np.array(single) == np.array(batched))
+print(f"predict_one and predict agree on {agreement:.4%} of ads")
@@ -0,0 +1,119 @@
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.linear_model import LogisticRegression
+
+# Ad columns used next to the headline embeddings
+FEATURE_COLUMNS = ['experience_required', 'access_to_own_car', 'remote_work']
+
+# Bumped whenever the layout of a saved model changes
+ARTIFACT_FORMAT = 1
+
+
+class DrivingLicenceModel:
+    """Predicts whether a job ad requires a driving licence.
+
+    Holds the headline featurizer and the logistic regression together, so
+    that a saved model scores new ads without gensim or retraining. Use
+    `predict` for batches (a DataFrame or a list of ad dicts) and
+    `predict_one` for a single ad dict; `predict_one` skips pandas and
+    scikit-learn's input validation and computes the linear decision directly.
+    It agrees with `predict` up to floating-point rounding at the decision
+    boundary.
+    """
+
+    def __init__(self, embedder, feature_columns=FEATURE_COLUMNS, max_iter=5000):
+        self.embedder = embedder
+        self.feature_columns = list(feature_columns)
+        self.classifier = LogisticRegression(max_iter=max_iter)
+        self.version = None
+        self._linear = None
+
+    @property
+    def n_features(self):
+        return len(self.feature_columns) + self.embedder.vectors.shape[1]
+
+    def features(self, ads):
+        """Feature matrix (float32) for a DataFrame or list of ad dicts."""
+        headlines = ads['headline'] if hasattr(ads, 'columns') else [ad.get('headline') for ad in ads]
+        X = np.empty((len(headlines), self.n_features), dtype=np.float32)
+        for i, column in enumerate(self.feature_columns):
+            X[:, i] = ads[column] if hasattr(ads, 'columns') else [ad[column] for ad in ads]
+        X[:, len(self.feature_columns):] = self.embedder.transform(headlines)
+        return X
+
+    def fit(self, X, y):
+        self.classifier.fit(X, y)
+        self._linear = None
+        return self
+
+    def predict_features(self, X):
+        return self.classifier.predict(X)
+
+    def predict(self, ads):
+        return self.predict_features(self.features(ads))
+
+    def predict_batches(self, ads, batch_size=1024):
+        """Predict an iterable of ad dicts in micro-batches, yielding one prediction per ad."""
+        batch = []
+        for ad in ads:
+            batch.append(ad)
+            if len(batch) == batch_size:
+                yield from self.predict(batch)
+                batch = []
+        if batch:
+            yield from self.predict(batch)
+
+    def predict_one(self, ad):
+        if self._linear is None:
+            self._linear = (self.classifier.coef_[0], float(self.classifier.intercept_[0]))
+        coef, intercept = self._linear
+        # A buffer per call, so concurrent requests never share one
+        x = np.empty(self.n_features, dtype=np.float32)
+        n = len(self.feature_columns)
+        for i, column in enumerate(self.feature_columns):
+            x[i] = ad[column]
+        self.embedder.embed_one(ad.get('headline'), out=x[n:])
+        return self.classifier.classes_[int(float(x @ coef) + intercept > 0)]
+
+    def warm(self):
+        """Run one single and one batch prediction so the first real call is not the slow one."""
+        ad = {column: 0 for column in self.feature_columns}
+        ad['headline'] = self.embedder.vocabulary[0] if len(self.embedder.vocabulary) else ''
+        self.predict_one(ad)
+        self.predict([ad] * 8)
+        return self
+
+    def save(self, path):
+        """Save the featurizer, classifier and feature columns as one file."""
+        self.version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        self._linear = None
+        joblib.dump({
+            'format': ARTIFACT_FORMAT,
+            'version': self.version,
+            'sklearn_version': sklearn.__version__,
+            'model': self,
+        }, path)
+
+    @staticmethod
+    def load(path):
+        artifact = joblib.load(path)
+        if artifact.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"{path} has model format {artifact.get('format')}, expected {ARTIFACT_FORMAT}")
+        if artifact['sklearn_version'] != sklearn.__version__:
+            print(f"Warning: {path} was saved with scikit-learn {artifact['sklearn_version']}, "
+                  f"running {sklearn.__version__}")
+        return artifact['model']
+
+
+@lru_cache(maxsize=None)
+def load_model(path):
+    """Load a saved model once per process and warm it up."""
+    start = time.perf_counter()
+    model = DrivingLicenceModel.load(path).warm()
+    print(f"Loaded driving licence model {model.version} from {path} in {time.perf_counter() - start:.2f}s")
+    return model
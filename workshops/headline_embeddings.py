@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def headline_tokens(headlines):
+    """Split headlines on whitespace; missing headlines have no tokens."""
+    return [headline.split() if isinstance(headline, str) else [] for headline in headlines]
+
+
+class HeadlineEmbedder:
+    """Mean word embeddings of job ad headlines, computed for all headlines at once.
+
+    `word_vectors` is a gensim KeyedVectors, e.g. `Word2Vec(...).wv`. The
+    headlines are tokenized once, every token is looked up in the vocabulary
+    in one vectorized call, and the means are a single sparse (headlines x
+    vocabulary) averaging matrix times the embedding matrix, giving a float32
+    array. Words outside the vocabulary are ignored; headlines that are empty
+    or have no known words get a zero vector.
+    """
+
+    def __init__(self, word_vectors):
+        self.vocabulary = pd.Index(word_vectors.index_to_key)
+        self.vectors = np.asarray(word_vectors.vectors, dtype=np.float32)
+        self.columns = [f'embedding_{i}' for i in range(self.vectors.shape[1])]
+        self._word_ids = None
+
+    def embed_one(self, headline, out=None):
+        """Mean embedding of a single headline, without building a sparse matrix.
+
+        Gives the same vector as transform([headline]) at a fraction of the
+        overhead, for scoring one ad at a time. Writes into `out` if given.
+        """
+        if self._word_ids is None:
+            self._word_ids = {word: i for i, word in enumerate(self.vocabulary)}
+        out = np.zeros(self.vectors.shape[1], dtype=np.float32) if out is None else out
+        word_ids = [self._word_ids[token] for token in headline_tokens([headline])[0] if token in self._word_ids]
+        if word_ids:
+            np.mean(self.vectors[word_ids], axis=0, out=out)
+        else:
+            out[:] = 0
+        return out
+
+    def transform(self, headlines):
+        """Mean embedding of each headline as an (n_headlines, vector_size) float32 array."""
+        tokens = headline_tokens(headlines)
+        counts = np.fromiter((len(row) for row in tokens), dtype=np.int64, count=len(tokens))
+        rows = np.repeat(np.arange(len(tokens)), counts)
+        word_ids = self.vocabulary.get_indexer([token for row in tokens for token in row])
+
+        known = word_ids >= 0
+        rows, word_ids = rows[known], word_ids[known]
+        # Each known word weighs 1/(known words in its headline), so a row of the
+        # matrix product is the mean of that headline's word vectors
+        known_counts = np.bincount(rows, minlength=len(tokens))
+        weights = (1.0 / known_counts[rows]).astype(np.float32)
+        averaging = sparse.csr_matrix((weights, (rows, word_ids)), shape=(len(tokens), len(self.vocabulary)))
+        return np.asarray(averaging @ self.vectors, dtype=np.float32)
+
+    def transform_frame(self, headlines, index=None):
+        """Mean embeddings as a DataFrame with columns embedding_0, embedding_1, ..."""
+        return pd.DataFrame(self.transform(headlines), columns=self.columns, index=index)
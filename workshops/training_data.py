@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+
+class CategoricalArrowWriter:
+    """Streams DataFrame chunks into an uncompressed Arrow IPC file.
+
+    `schema` fixes the type of every column up front. Dictionary (categorical)
+    columns share one dictionary per column across all chunks: values keep the
+    code they got in the first chunk they appeared in, and new values are
+    appended, so each chunk only writes a delta with its new categories. The
+    file can be memory-mapped and read column by column with
+    read_training_data.
+    """
+
+    def __init__(self, path, schema):
+        self.schema = schema
+        self._writer = ipc.new_file(path, schema, options=ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+        self._categories = {
+            field.name: {} for field in schema if pa.types.is_dictionary(field.type)
+        }
+        self.rows = 0
+
+    def _encode(self, field, values):
+        if field.name not in self._categories:
+            return pa.array(values, type=field.type, from_pandas=True)
+        codes_by_value = self._categories[field.name]
+        present = values.dropna().unique()
+        for value in present:
+            codes_by_value.setdefault(value, len(codes_by_value))
+        # One vectorized lookup of every value's code; missing values stay null
+        codes = pd.Series(values).map(codes_by_value).to_numpy(dtype=float)
+        missing = np.isnan(codes)
+        indices = pa.array(np.where(missing, 0, codes).astype(np.int32), mask=missing)
+        dictionary = pa.array(list(codes_by_value), type=field.type.value_type)
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+    def categories(self, column):
+        """Categories of a dictionary column seen so far, in code order."""
+        return list(self._categories[column])
+
+    def write(self, frame):
+        arrays = [self._encode(field, frame[field.name]) for field in self.schema]
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.rows += len(frame)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_training_data(path, columns):
+    """Read only `columns` from a file written by CategoricalArrowWriter.
+
+    The file is memory-mapped, so columns that are not requested are never
+    read into memory. Dictionary columns come back as pandas categoricals.
+    """
+    with pa.memory_map(path) as source:
+        table = ipc.open_file(source).read_all().select(columns)
+        return table.to_pandas()